@@ -14,12 +14,16 @@
 
 """Murf AI plugin for LiveKit Agents"""
 
+from .cache import AudioCache
+from .metrics import start_metrics_server
 from .tts import TTS, ChunkedStream
 from .version import __version__
 
 __all__ = [
     "TTS",
     "ChunkedStream",
+    "AudioCache",
+    "start_metrics_server",
     "__version__",
 ]
 
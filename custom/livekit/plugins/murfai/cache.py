@@ -0,0 +1,256 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+
+import prometheus_client
+
+CACHE_REQUESTS = prometheus_client.Counter(
+    "murf_tts_cache_requests_total", "Audio cache lookups by tier", ["result"]
+)
+
+# options that change the synthesized audio
+_KEY_FIELDS = ("model", "voice", "style", "locale", "speed", "pitch", "sample_rate", "encoding")
+
+
+def normalize_text(text: str) -> str:
+    # whitespace never changes the audio; case and punctuation can
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def voice_key(opts: Any) -> str:
+    """Stable id of the voice settings in `opts` (any object with the _KEY_FIELDS attributes)."""
+    return json.dumps([getattr(opts, name) for name in _KEY_FIELDS], separators=(",", ":"))
+
+
+def cache_key(text: str, voice: str) -> str:
+    return hashlib.sha256(f"{voice}\n{normalize_text(text)}".encode()).hexdigest()
+
+
+class AudioCache:
+    """
+    Content-addressed cache of synthesized PCM, keyed on text plus every voice option.
+
+    A memory tier of up to `max_memory_bytes` sits in front of an optional disk tier in
+    `disk_dir` of up to `max_disk_bytes`; both evict least-recently-used entries by size.
+    Disk entries are `<key>.pcm` plus a `<key>.json` sidecar with the text, so the
+    phrase index is rebuilt from disk on start and worker processes can share entries.
+
+    The phrase index lets a stream tell early whether its incoming text can still be a
+    cached phrase, so text that cannot be waits for nothing. Its per-voice sets are
+    frozensets replaced on every write, so lookups read them without the lock.
+
+    Only phrases registered with `allow` (as `TTS.prewarm_cache` does) are stored, so
+    arbitrary caller speech never lands in memory or on disk, nor evicts them.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_memory_bytes: int = 32 * 1024 * 1024,
+        disk_dir: str | os.PathLike | None = None,
+        max_disk_bytes: int = 512 * 1024 * 1024,
+        max_text_chars: int = 200,
+    ) -> None:
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.max_text_chars = max_text_chars
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+
+        self._memory: OrderedDict[str, tuple[bytes, str, str]] = OrderedDict()  # key -> (audio, voice, text)
+        self._memory_bytes = 0
+        self._disk: OrderedDict[str, int] = OrderedDict()  # key -> size, oldest first
+        self._disk_bytes = 0
+        self._phrases: dict[str, frozenset[str]] = {}  # voice key -> normalized cached texts
+        self._allowed: dict[str, frozenset[str]] = {}  # voice key -> normalized cacheable texts
+        self._lock = threading.Lock()
+
+        if self.disk_dir is not None:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+            self._load_disk_index()
+
+    # --------- Lookups ---------
+    def may_match(self, text: str, voice: str) -> bool:
+        """Whether `text` is a prefix of some cached phrase for this voice."""
+        text = normalize_text(text)
+        phrases = self._phrases.get(voice)
+        return bool(phrases) and any(phrase.startswith(text) for phrase in phrases)
+
+    def contains(self, text: str, voice: str) -> bool:
+        return normalize_text(text) in self._phrases.get(voice, ())
+
+    def allows(self, text: str, voice: str) -> bool:
+        """Whether `text` was registered with `allow` for this voice."""
+        return normalize_text(text) in self._allowed.get(voice, ())
+
+    def get(self, text: str, voice: str) -> bytes | None:
+        if not self.contains(text, voice):
+            return None
+        text = normalize_text(text)
+        key = cache_key(text, voice)
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                CACHE_REQUESTS.labels(result="memory_hit").inc()
+                return entry[0]
+
+        audio = self._read_disk(key)
+        with self._lock:
+            if audio is None:
+                # evicted, possibly by another process
+                self._discard_phrase(voice, text)
+                CACHE_REQUESTS.labels(result="miss").inc()
+                return None
+            CACHE_REQUESTS.labels(result="disk_hit").inc()
+            self._put_memory(key, audio, voice, text)
+        return audio
+
+    async def aget(self, text: str, voice: str) -> bytes | None:
+        if not self.contains(text, voice):
+            return None
+        # memory hits answer inline; only a disk read goes to a thread
+        key = cache_key(text, voice)
+        if key in self._memory:
+            return self.get(text, voice)
+        return await asyncio.to_thread(self.get, text, voice)
+
+    # --------- Writes ---------
+    def allow(self, phrases: list[str], voice: str) -> None:
+        """Register `phrases` as cacheable for this voice; `put` ignores any other text."""
+        texts = {normalize_text(p) for p in phrases} - {""}
+        with self._lock:
+            self._allowed[voice] = self._allowed.get(voice, frozenset()) | texts
+
+    def put(self, text: str, voice: str, audio: bytes) -> bool:
+        """Cache `audio` for `text`; returns False if the text is not allowed, too long or the audio empty."""
+        text = normalize_text(text)
+        if not audio or not text or len(text) > self.max_text_chars or not self.allows(text, voice):
+            return False
+        key = cache_key(text, voice)
+
+        with self._lock:
+            self._put_memory(key, audio, voice, text)
+            self._add_phrase(voice, text)
+        if self.disk_dir is not None:
+            self._write_disk(key, text, voice, audio)
+        return True
+
+    async def aput(self, text: str, voice: str, audio: bytes) -> bool:
+        return await asyncio.to_thread(self.put, text, voice, audio)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "memory_entries": len(self._memory),
+            "memory_bytes": self._memory_bytes,
+            "disk_entries": len(self._disk),
+            "disk_bytes": self._disk_bytes,
+            "phrases": sum(len(p) for p in list(self._phrases.values())),
+        }
+
+    # --------- Internals ---------
+    def _add_phrase(self, voice: str, text: str) -> None:
+        # with the lock held; a new frozenset, never mutated in place
+        self._phrases[voice] = self._phrases.get(voice, frozenset()) | {text}
+
+    def _discard_phrase(self, voice: str, text: str) -> None:
+        # with the lock held
+        phrases = self._phrases.get(voice)
+        if phrases and text in phrases:
+            self._phrases[voice] = phrases - {text}
+
+    def _put_memory(self, key: str, audio: bytes, voice: str, text: str) -> None:
+        if len(audio) > self.max_memory_bytes:
+            return
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= len(previous[0])
+        self._memory[key] = (audio, voice, text)
+        self._memory_bytes += len(audio)
+        while self._memory_bytes > self.max_memory_bytes:
+            _, (evicted, evicted_voice, evicted_text) = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+            if self.disk_dir is None:
+                self._discard_phrase(evicted_voice, evicted_text)
+
+    def _paths(self, key: str) -> tuple[Path, Path]:
+        assert self.disk_dir is not None
+        return self.disk_dir / f"{key}.pcm", self.disk_dir / f"{key}.json"
+
+    def _read_disk(self, key: str) -> bytes | None:
+        if self.disk_dir is None:
+            return None
+        pcm_path, _ = self._paths(key)
+        try:
+            audio = pcm_path.read_bytes()
+            os.utime(pcm_path)  # recency for the disk LRU, also across processes
+        except FileNotFoundError:
+            return None
+        with self._lock:
+            if key in self._disk:
+                self._disk.move_to_end(key)
+        return audio
+
+    def _write_disk(self, key: str, text: str, voice: str, audio: bytes) -> None:
+        pcm_path, meta_path = self._paths(key)
+        suffix = f".{os.getpid()}.{threading.get_ident()}.tmp"
+        for path, data in (
+            (pcm_path, audio),
+            (meta_path, json.dumps({"text": text, "voice": voice}).encode()),
+        ):
+            tmp_path = path.with_name(path.name + suffix)
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, path)
+
+        with self._lock:
+            previous = self._disk.pop(key, None)
+            if previous is not None:
+                self._disk_bytes -= previous
+            self._disk[key] = len(audio)
+            self._disk_bytes += len(audio)
+            evicted = []
+            while self._disk_bytes > self.max_disk_bytes and len(self._disk) > 1:
+                old_key, size = self._disk.popitem(last=False)
+                self._disk_bytes -= size
+                evicted.append(old_key)
+
+        for old_key in evicted:
+            self._evict_disk(old_key)
+
+    def _evict_disk(self, key: str) -> None:
+        pcm_path, meta_path = self._paths(key)
+        try:
+            meta = json.loads(meta_path.read_text())
+            with self._lock:
+                self._discard_phrase(meta["voice"], meta["text"])
+        except (FileNotFoundError, ValueError, KeyError):
+            pass
+        for path in (pcm_path, meta_path):
+            path.unlink(missing_ok=True)
+
+    def _load_disk_index(self) -> None:
+        assert self.disk_dir is not None
+        entries = []
+        for meta_path in self.disk_dir.glob("*.json"):
+            pcm_path = meta_path.with_suffix(".pcm")
+            try:
+                meta = json.loads(meta_path.read_text())
+                stat = pcm_path.stat()
+            except (FileNotFoundError, ValueError):
+                continue
+            entries.append((stat.st_mtime, meta_path.stem, stat.st_size, meta))
+
+        phrases: dict[str, set[str]] = {}
+        for _, key, size, meta in sorted(entries):
+            self._disk[key] = size
+            self._disk_bytes += size
+            phrases.setdefault(meta["voice"], set()).add(meta["text"])
+        self._phrases = {voice: frozenset(texts) for voice, texts in phrases.items()}
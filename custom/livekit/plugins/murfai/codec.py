@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import binascii
+import json
+from typing import Any, NamedTuple, Optional
+
+# msgspec decodes straight into typed messages, base64 audio included; orjson and the
+# stdlib go through a dict
+try:
+    import msgspec
+except ImportError:
+    msgspec = None  # type: ignore[assignment]
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore[assignment]
+
+
+if msgspec is not None:
+
+    class TextPacket(msgspec.Struct, omit_defaults=True):
+        """Client -> Murf: a text chunk, or `end` to close the context."""
+
+        voice_config: dict[str, Any]
+        context_id: str
+        text: Optional[str] = None  # msgspec resolves these at runtime, keep them 3.9-compatible
+        end: bool = False
+
+    class ClearPacket(msgspec.Struct):
+        """Client -> Murf: stop synthesizing a context and drop its pending audio."""
+
+        context_id: str
+        clear: bool = True
+
+    class AudioMessage(msgspec.Struct):
+        """Murf -> client: audio for a context, or `final` once it is done."""
+
+        context_id: Optional[str] = None
+        audio: Optional[bytes] = None  # base64 on the wire, decoded by msgspec without an interim str
+        final: bool = False
+
+    _encoder = msgspec.json.Encoder()
+    _audio_decoder = msgspec.json.Decoder(AudioMessage)
+
+    def encode_text_packet(
+        voice_config: dict[str, Any], context_id: str, text: str | None = None, end: bool = False
+    ) -> str:
+        return _encoder.encode(TextPacket(voice_config, context_id, text, end)).decode()
+
+    def encode_clear_packet(context_id: str) -> str:
+        return _encoder.encode(ClearPacket(context_id)).decode()
+
+    def decode_audio_message(data: str | bytes) -> AudioMessage:
+        return _audio_decoder.decode(data)
+
+    DECODE_ERRORS: tuple[type[Exception], ...] = (msgspec.DecodeError,)
+
+else:
+
+    class AudioMessage(NamedTuple):  # type: ignore[no-redef]
+        context_id: str | None = None
+        audio: bytes | None = None
+        final: bool = False
+
+    if orjson is not None:
+        _dumps, _loads = orjson.dumps, orjson.loads
+        DECODE_ERRORS = (orjson.JSONDecodeError, binascii.Error)
+    else:
+
+        def _dumps(obj: Any) -> bytes:
+            return json.dumps(obj, separators=(",", ":")).encode()
+
+        _loads = json.loads
+        DECODE_ERRORS = (json.JSONDecodeError, binascii.Error)
+
+    def encode_text_packet(
+        voice_config: dict[str, Any], context_id: str, text: str | None = None, end: bool = False
+    ) -> str:
+        pkt: dict[str, Any] = {"voice_config": voice_config, "context_id": context_id}
+        if text is not None:
+            pkt["text"] = text
+        if end:
+            pkt["end"] = True
+        return _dumps(pkt).decode()
+
+    def encode_clear_packet(context_id: str) -> str:
+        return _dumps({"context_id": context_id, "clear": True}).decode()
+
+    def decode_audio_message(data: str | bytes) -> AudioMessage:
+        msg = _loads(data)
+        audio = msg.get("audio")
+        return AudioMessage(msg.get("context_id"), binascii.a2b_base64(audio) if audio else None, bool(msg.get("final")))
+
+
+BACKEND = "msgspec" if msgspec is not None else "orjson" if orjson is not None else "json"
+
+
+# Per-frame decode cost (JSON + base64) through the AudioEmitter's own re-framing,
+# typed codec vs json.loads + b64decode (run with: python -m custom.livekit.plugins.murfai.codec)
+if __name__ == "__main__":
+    import base64
+    import os
+    import random
+    import time
+    import tracemalloc
+
+    from livekit.agents.utils.audio import AudioByteStream
+
+    sample_rate = 44100
+    rng = random.Random(0)
+    # Murf-like streamed frames: 2-12 KB of 16-bit mono pcm, base64 in a JSON text message
+    frames = [
+        json.dumps(
+            {
+                "audio": base64.b64encode(os.urandom(rng.randrange(2048, 12288, 2))).decode(),
+                "context_id": "ctx_4kX9cQ2pLm",
+                "final": False,
+            }
+        )
+        for _ in range(500)
+    ]
+
+    def stdlib(bstream: AudioByteStream) -> int:
+        pushed = 0
+        for frame in frames:
+            data = json.loads(frame)
+            pushed += len(bstream.write(base64.b64decode(data["audio"])))
+        return pushed + len(bstream.flush())
+
+    def typed(bstream: AudioByteStream) -> int:
+        pushed = 0
+        for frame in frames:
+            pushed += len(bstream.write(decode_audio_message(frame).audio or b""))
+        return pushed + len(bstream.flush())
+
+    def new_stream() -> AudioByteStream:
+        # what AudioEmitter builds for pcm output (frame_size_ms=200)
+        return AudioByteStream(sample_rate=sample_rate, num_channels=1, samples_per_channel=sample_rate // 1000 * 200)
+
+    rounds = 20
+    print(f"{len(frames)} frames through AudioByteStream, {rounds} rounds")
+    print(f"{'path':<22} {'ms':>8} {'frames':>7} {'peak KB':>8}")
+    for name, fn in (("json.loads+b64decode", stdlib), (f"{BACKEND} codec", typed)):
+        started = time.perf_counter()
+        for _ in range(rounds):
+            out = fn(new_stream())
+        elapsed_ms = (time.perf_counter() - started) * 1000 / rounds
+
+        tracemalloc.start()
+        fn(new_stream())
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        print(f"{name:<22} {elapsed_ms:>8.2f} {out:>7} {peak / 1024:>8.1f}")
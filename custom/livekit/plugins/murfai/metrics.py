@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import contextvars
+import os
+import tempfile
+import time
+from collections import OrderedDict
+
+import prometheus_client
+from livekit.agents.metrics import TTSMetrics
+
+# --------- Prometheus collectors ---------
+# registered on the default registry, like livekit.agents.telemetry.metrics. They are
+# updated in the job processes, so start_metrics_server() serves them in multiprocess mode
+
+CONNECT_TIME = prometheus_client.Histogram(
+    "murf_tts_connect_seconds",
+    "Time to open a Murf websocket",
+    buckets=(0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1, 2, 5),
+)
+POOL_REQUESTS = prometheus_client.Counter(
+    "murf_tts_pool_requests_total", "Websocket requests by pool result", ["result"]
+)
+POOL_CONNECTS = prometheus_client.Counter(
+    "murf_tts_pool_connects_total",
+    "Websockets opened, on the request path or ahead of demand in the background",
+    ["trigger"],
+)
+POOL_WAIT = prometheus_client.Histogram(
+    "murf_tts_pool_wait_seconds",
+    "Time a stream waited for a websocket slot",
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.2, 0.5, 1, 2, 5),
+)
+# occupancy: active contexts / (connections * max contexts per connection)
+POOL_CONNECTIONS = prometheus_client.Gauge(
+    "murf_tts_pool_connections", "Open Murf websockets", multiprocess_mode="livesum"
+)
+POOL_ACTIVE_CONTEXTS = prometheus_client.Gauge(
+    "murf_tts_pool_active_contexts", "Murf contexts in use on open websockets", multiprocess_mode="livesum"
+)
+TIME_TO_FIRST_AUDIO = prometheus_client.Histogram(
+    "murf_tts_time_to_first_audio_seconds",
+    "First text in to first audio byte from Murf, including the wait for the tokenizer",
+    ["streamed"],
+    buckets=(0.1, 0.2, 0.3, 0.4, 0.5, 0.75, 1, 1.5, 2, 3, 5),
+)
+REQUEST_LATENCY = prometheus_client.Histogram(
+    "murf_tts_request_seconds",
+    "First text in to last audio byte from Murf, per completed request (one Murf context when streamed)",
+    ["streamed"],
+    buckets=(0.25, 0.5, 1, 2, 4, 8, 16, 32, 64),
+)
+REAL_TIME_FACTOR = prometheus_client.Histogram(
+    "murf_tts_real_time_factor",
+    "LiveKit's request duration divided by audio duration (below 1 is faster than real time)",
+    ["streamed"],
+    buckets=(0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1, 1.5, 2, 4),
+)
+AUDIO_BYTES = prometheus_client.Counter(
+    "murf_tts_audio_bytes_total", "Audio bytes received from Murf, decoded from base64", ["encoding"]
+)
+AUDIO_SECONDS = prometheus_client.Counter(
+    "murf_tts_audio_seconds_total", "Audio synthesized by Murf, as decoded by the AudioEmitter"
+)
+CANCELLED_CONTEXTS = prometheus_client.Counter(
+    "murf_tts_cancelled_contexts_total", "Murf contexts cleared before their final audio, e.g. on barge-in"
+)
+STALE_MESSAGES = prometheus_client.Counter(
+    "murf_tts_stale_messages_total", "Messages Murf sent for already cancelled contexts, dropped"
+)
+ERRORS = prometheus_client.Counter(
+    "murf_tts_errors_total", "Failed Murf attempts; recoverable ones are retried", ["recoverable"]
+)
+
+
+# set by TTS._connect_ws in the task that asked the pool for a connection
+connect_time_var: contextvars.ContextVar[float | None] = contextvars.ContextVar(
+    "murf_connect_time", default=None
+)
+
+# request ids served from the audio cache, kept out of the real-time factor
+MAX_CACHE_HIT_IDS = 1024
+_cache_hit_ids: OrderedDict[str, None] = OrderedDict()
+
+
+def observe_tts_metrics(metrics: TTSMetrics) -> None:
+    """Record the audio duration from the TTSMetrics LiveKit emits as "metrics_collected"."""
+    if metrics.request_id in _cache_hit_ids:
+        del _cache_hit_ids[metrics.request_id]
+        return
+    streamed = str(metrics.streamed).lower()
+    if metrics.audio_duration > 0:
+        REAL_TIME_FACTOR.labels(streamed=streamed).observe(metrics.duration / metrics.audio_duration)
+        AUDIO_SECONDS.inc(metrics.audio_duration)
+
+
+class RequestRecorder:
+    """
+    Collects the Murf side of one synthesis request: latency, pool use, connect time and bytes.
+
+    Latency is measured from the first text the stream got, so unlike LiveKit's ttfb it
+    includes the time spent waiting for the tokenizer; audio duration comes from
+    LiveKit's own TTSMetrics (observe_tts_metrics).
+    """
+
+    def __init__(self, request_id: str, *, streamed: bool, compressed: bool = False) -> None:
+        self.request_id = request_id
+        self.streamed = str(streamed).lower()
+        self.encoding = "compressed" if compressed else "pcm"
+        self.first_text_at: float | None = None
+        self.first_send_at: float | None = None
+        self.first_audio_at: float | None = None
+        self.last_audio_at: float | None = None
+        self.completed = False
+        self.cache_hit = False
+        self.pool_hit: bool | None = None
+        self.connect_time = 0.0
+        self.audio_bytes = 0
+
+    def text_received(self) -> None:
+        if self.first_text_at is None:
+            self.first_text_at = time.perf_counter()
+
+    def text_sent(self) -> None:
+        if self.first_send_at is None:
+            self.first_send_at = time.perf_counter()
+
+    def served_from_cache(self) -> None:
+        self.cache_hit = True
+        _cache_hit_ids[self.request_id] = None
+        if len(_cache_hit_ids) > MAX_CACHE_HIT_IDS:
+            _cache_hit_ids.popitem(last=False)
+
+    def connected(self) -> None:
+        """Call right after getting a websocket context; reads whether its socket was freshly opened."""
+        connect_time = connect_time_var.get()
+        connect_time_var.set(None)
+        self.pool_hit = connect_time is None
+        self.connect_time = connect_time or 0.0
+        POOL_REQUESTS.labels(result="hit" if self.pool_hit else "miss").inc()
+
+    def audio_received(self, nbytes: int) -> bool:
+        """Count audio; returns True for the first audio of the request."""
+        self.audio_bytes += nbytes
+        self.last_audio_at = time.perf_counter()
+        if self.first_audio_at is None:
+            self.first_audio_at = self.last_audio_at
+            return True
+        return False
+
+    def audio_done(self) -> None:
+        """Call when Murf sent all of the request's audio; cancelled requests get no request latency."""
+        self.completed = True
+
+    def finish(self) -> None:
+        # cache hits are counted by the cache
+        if self.cache_hit:
+            return
+        AUDIO_BYTES.labels(encoding=self.encoding).inc(self.audio_bytes)
+        if self.first_text_at is None or self.first_audio_at is None:
+            return
+        TIME_TO_FIRST_AUDIO.labels(streamed=self.streamed).observe(self.first_audio_at - self.first_text_at)
+        if self.completed:
+            REQUEST_LATENCY.labels(streamed=self.streamed).observe(self.last_audio_at - self.first_text_at)
+
+
+def start_metrics_server(port: int, addr: str = "0.0.0.0") -> None:
+    """
+    Serve the Prometheus metrics of every job process on :port/metrics from a background thread.
+
+    Synthesis runs in the worker's job processes, not in the process calling this, so
+    metrics go through prometheus_client's multiprocess mode: each job process writes
+    its samples under PROMETHEUS_MULTIPROC_DIR and this server sums them. Call it in
+    the worker's main process before cli.run_app, so the job processes inherit the
+    directory; a temporary one is created if PROMETHEUS_MULTIPROC_DIR is not set. The
+    pool gauges return to zero as jobs close their TTS, but a job process that crashes
+    keeps its last gauge values until the worker restarts.
+    """
+    from prometheus_client import multiprocess
+
+    if not os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        os.environ["PROMETHEUS_MULTIPROC_DIR"] = tempfile.mkdtemp(prefix="murf-metrics-")
+    registry = prometheus_client.CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    prometheus_client.start_http_server(port, addr=addr, registry=registry)
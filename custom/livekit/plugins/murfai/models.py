@@ -54,7 +54,11 @@ TTSStyles = Literal[
 
 TTSEncoding = Literal[
     "pcm",  # pcm_s16le
+    "mp3",
+    "ogg",  # ogg container (opus); decoded by the AudioEmitter like mp3
 ]
 
+TTSSampleRates = Literal[8000, 24000, 44100, 48000]
+
 TTSDefaultVoiceId = "en-US-amara"
 TTSDefaultVoiceStyle = "Conversational"
@@ -0,0 +1,437 @@
+from __future__ import annotations
+
+import asyncio
+import math
+import time
+import weakref
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Awaitable
+from contextlib import asynccontextmanager
+from typing import Any, Callable
+
+import aiohttp
+from livekit.agents import APIStatusError, utils
+
+from .codec import (
+    DECODE_ERRORS,
+    AudioMessage,
+    decode_audio_message,
+    encode_clear_packet,
+    encode_text_packet,
+)
+from .log import logger
+from .metrics import (
+    CANCELLED_CONTEXTS,
+    POOL_ACTIVE_CONTEXTS,
+    POOL_CONNECTIONS,
+    POOL_CONNECTS,
+    POOL_WAIT,
+    STALE_MESSAGES,
+)
+
+# cancelled context ids remembered per socket, to tell their late messages from strays
+MAX_CANCELLED_CONTEXTS = 256
+
+
+class MuxContext:
+    """
+    One Murf context on a shared websocket: the text sent for it and the audio routed back.
+
+    Iterating yields its AudioMessages up to and including the `final` one. At most
+    `max_queued` messages wait here; a consumer that falls further behind is cleared on
+    Murf and failed, so it never holds up the other contexts sharing its socket.
+    """
+
+    def __init__(self, conn: MuxConnection, context_id: str, max_queued: int) -> None:
+        self.context_id = context_id
+        self._conn = conn
+        self._queue: asyncio.Queue[AudioMessage | BaseException] = asyncio.Queue(max_queued)
+        self.done = False
+        self._sent = False
+
+    async def send_text(self, voice_config: dict[str, Any], text: str) -> None:
+        self._sent = True
+        await self._conn.send_str(encode_text_packet(voice_config, self.context_id, text=text))
+
+    async def end(self, voice_config: dict[str, Any]) -> None:
+        """Tell Murf no more text is coming; it answers with a `final` message."""
+        self._sent = True
+        await self._conn.send_str(encode_text_packet(voice_config, self.context_id, end=True))
+
+    async def recv(self) -> AudioMessage:
+        item = await self._queue.get()
+        if isinstance(item, BaseException):
+            raise item
+        if item.final:
+            self.done = True
+        return item
+
+    async def __aiter__(self) -> AsyncIterator[AudioMessage]:
+        while not self.done:
+            yield await self.recv()
+
+    def close(self) -> None:
+        """Give the context's slot back to its connection."""
+        self.done = True
+        self._conn._release(self)
+
+    def cancel(self) -> None:
+        """
+        Stop the context now, e.g. on barge-in: Murf is told to clear it, and audio queued
+        or still arriving for it is dropped. The socket stays open for other contexts.
+        """
+        # a context the connection already dropped was cleared then
+        if self._sent and not self.done and self.context_id in self._conn._contexts:
+            self._conn._clear(self.context_id)
+        self.close()
+        while not self._queue.empty():
+            self._queue.get_nowait()
+
+    def _fail(self, error: BaseException) -> None:
+        # the context is lost anyway, make room for the error if the queue is full
+        if self._queue.full():
+            self._queue.get_nowait()
+        self._queue.put_nowait(error)
+
+
+class MuxConnection:
+    """A Murf websocket carrying up to `max_contexts` contexts at once."""
+
+    def __init__(self, ws: aiohttp.ClientWebSocketResponse, *, max_contexts: int, max_queued: int) -> None:
+        self.ws = ws
+        self.max_contexts = max_contexts
+        self.connected_at = time.monotonic()
+        self.closed = False
+        self._max_queued = max_queued
+        self._contexts: dict[str, MuxContext] = {}
+        self._send_lock = asyncio.Lock()
+        self._cancelled: OrderedDict[str, None] = OrderedDict()
+        self._clear_tasks: set[asyncio.Task] = set()
+        self._on_idle: Callable[[MuxConnection], None] | None = None
+        self._read_task = asyncio.create_task(self._read_loop())
+
+    @property
+    def active(self) -> int:
+        return len(self._contexts)
+
+    def has_capacity(self) -> bool:
+        return not self.closed and len(self._contexts) < self.max_contexts
+
+    def open_context(self) -> MuxContext:
+        ctx = MuxContext(self, utils.shortuuid(), self._max_queued)
+        self._contexts[ctx.context_id] = ctx
+        POOL_ACTIVE_CONTEXTS.inc()
+        return ctx
+
+    async def send_str(self, data: str) -> None:
+        async with self._send_lock:
+            await self.ws.send_str(data)
+
+    def _clear(self, context_id: str) -> None:
+        CANCELLED_CONTEXTS.inc()
+        self._cancelled[context_id] = None
+        if len(self._cancelled) > MAX_CANCELLED_CONTEXTS:
+            self._cancelled.popitem(last=False)
+        if self.closed:
+            return
+
+        # sent from a task: cancel() runs while the stream itself is being cancelled
+        async def _send_clear() -> None:
+            try:
+                await self.send_str(encode_clear_packet(context_id))
+            except Exception as e:
+                logger.debug("could not clear Murf context %s: %s", context_id, e)
+
+        task = asyncio.create_task(_send_clear())
+        self._clear_tasks.add(task)
+        task.add_done_callback(self._clear_tasks.discard)
+
+    def _drop(self, ctx: MuxContext) -> None:
+        """Clear a context whose consumer stopped reading and fail it, freeing its slot."""
+        logger.warning("Murf context %s fell %d messages behind, dropping it", ctx.context_id, self._max_queued)
+        self._clear(ctx.context_id)
+        self._release(ctx)
+        ctx._fail(APIStatusError("Murf AI context dropped: audio was not being consumed", retryable=False))
+
+    def _release(self, ctx: MuxContext) -> None:
+        if self._contexts.pop(ctx.context_id, None) is None:
+            return
+        POOL_ACTIVE_CONTEXTS.dec()
+        if not self._contexts and self._on_idle:
+            self._on_idle(self)
+
+    async def _read_loop(self) -> None:
+        error: BaseException = APIStatusError("Murf AI connection closed unexpectedly")
+        try:
+            while True:
+                msg = await self.ws.receive()
+                if msg.type in (
+                    aiohttp.WSMsgType.CLOSED,
+                    aiohttp.WSMsgType.CLOSE,
+                    aiohttp.WSMsgType.CLOSING,
+                ):
+                    break
+
+                if msg.type != aiohttp.WSMsgType.TEXT:
+                    logger.warning("unexpected Murf AI message type %s", msg.type)
+                    continue
+
+                try:
+                    data = decode_audio_message(msg.data)
+                except DECODE_ERRORS:
+                    logger.warning("unexpected message %s", msg.data)
+                    continue
+
+                ctx = self._contexts.get(data.context_id) if data.context_id else None
+                if ctx is None:
+                    if data.context_id in self._cancelled:
+                        # generated before Murf saw the clear
+                        STALE_MESSAGES.inc()
+                        if data.final:
+                            del self._cancelled[data.context_id]
+                    else:
+                        logger.warning("unexpected message %s", msg.data)
+                    continue
+
+                # never wait on one context: the socket's other contexts share this reader
+                try:
+                    ctx._queue.put_nowait(data)
+                except asyncio.QueueFull:
+                    self._drop(ctx)
+        except Exception as e:
+            error = e
+        finally:
+            self.closed = True
+            for ctx in list(self._contexts.values()):
+                ctx._fail(error)
+
+    async def aclose(self) -> None:
+        if self._clear_tasks:
+            await asyncio.wait(self._clear_tasks, timeout=1)
+        self.closed = True
+        await self.ws.close()
+        await utils.aio.gracefully_cancel(self._read_task)
+
+
+class ContextMultiplexer:
+    """
+    Routes many streams' contexts over a few shared Murf websockets, kept warm ahead of demand.
+
+    A context goes to the busiest open connection with a free slot, so connections fill
+    up before new ones are opened. A background task keeps enough connections open for
+    the expected load: at least `min_connections`, and room for `contexts_per_session`
+    contexts per active session plus one spare slot. A session is a TTS instance that
+    used the multiplexer within the last `session_idle_timeout` seconds; connects go
+    through `connect_cb(session, timeout)`, with the requesting session or, in the
+    background, the most recently active one. The background task only runs while a
+    session is attached: once the last one is detached or garbage collected and its
+    contexts have ended, it stops and closes the multiplexer.
+
+    Connections stop taking new contexts `refresh_margin` seconds before they reach
+    `max_session_duration`; the background task opens their replacement and they close
+    once their last context ends. Connects on the request path only happen when demand
+    outruns the forecast; they are serialized, so streams that start together share the
+    socket the first of them opens.
+    """
+
+    def __init__(
+        self,
+        *,
+        connect_cb: Callable[[Any, float], Awaitable[aiohttp.ClientWebSocketResponse]],
+        max_contexts_per_connection: int = 8,
+        max_queued_messages: int = 64,
+        min_connections: int = 1,
+        contexts_per_session: float = 1.0,
+        max_session_duration: float = 300,
+        refresh_margin: float = 30,
+        session_idle_timeout: float = 120,
+        maintain_interval: float = 5,
+        connect_timeout: float = 10.0,
+    ) -> None:
+        self._connect_cb = connect_cb
+        self._max_contexts = max_contexts_per_connection
+        self._max_queued = max_queued_messages
+        self._min_connections = min_connections
+        self._contexts_per_session = contexts_per_session
+        self._max_session_duration = max_session_duration
+        self._refresh_margin = min(refresh_margin, max_session_duration / 2)
+        self._session_idle_timeout = session_idle_timeout
+        self._maintain_interval = maintain_interval
+        self._connect_timeout = connect_timeout
+        self._connections: list[MuxConnection] = []
+        self._sessions: weakref.WeakKeyDictionary[object, float] = weakref.WeakKeyDictionary()
+        self._connect_lock = asyncio.Lock()
+        self._wake = asyncio.Event()
+        self._maintain_task: asyncio.Task | None = None
+        self._closing: set[asyncio.Task] = set()
+        self._closed = False
+
+    @property
+    def connections(self) -> list[MuxConnection]:
+        return list(self._connections)
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    # --------- Sessions and demand ---------
+    def attach(self, owner: object) -> None:
+        """Count `owner` (a TTS instance) as a session; it stays counted while it is active."""
+        self._sessions[owner] = time.monotonic()
+
+    def detach(self, owner: object) -> bool:
+        """Stop counting `owner`; returns True once no session is attached."""
+        self._sessions.pop(owner, None)
+        return not self._sessions
+
+    def _latest_session(self) -> object | None:
+        return max(self._sessions.items(), key=lambda item: item[1], default=(None, 0))[0]
+
+    def active_sessions(self) -> int:
+        cutoff = time.monotonic() - self._session_idle_timeout
+        return sum(1 for last_active in self._sessions.values() if last_active >= cutoff)
+
+    def target_connections(self) -> int:
+        active_contexts = sum(c.active for c in self._connections)
+        expected = max(active_contexts, math.ceil(self.active_sessions() * self._contexts_per_session))
+        # one spare slot, so the next stream does not wait for a connect
+        return max(self._min_connections, math.ceil((expected + 1) / self._max_contexts))
+
+    def stats(self) -> dict[str, int]:
+        usable = [c for c in self._connections if self._usable(c)]
+        return {
+            "connections": len(self._connections),
+            "usable_connections": len(usable),
+            "target_connections": self.target_connections(),
+            "active_contexts": sum(c.active for c in self._connections),
+            "free_slots": sum(c.max_contexts - c.active for c in usable),
+            "sessions": self.active_sessions(),
+        }
+
+    # --------- Connections ---------
+    def _expiring(self, conn: MuxConnection) -> bool:
+        return time.monotonic() - conn.connected_at > self._max_session_duration - self._refresh_margin
+
+    def _usable(self, conn: MuxConnection) -> bool:
+        return not conn.closed and not self._expiring(conn)
+
+    def _pick(self) -> MuxConnection | None:
+        for conn in list(self._connections):
+            if conn.closed or (self._expiring(conn) and not conn.active):
+                self._discard(conn)
+        candidates = [c for c in self._connections if c.has_capacity() and self._usable(c)]
+        return max(candidates, key=lambda c: c.active, default=None)
+
+    def _discard(self, conn: MuxConnection) -> None:
+        if conn not in self._connections:
+            return
+        self._connections.remove(conn)
+        POOL_CONNECTIONS.dec()
+        task = asyncio.create_task(conn.aclose())
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    def _on_idle(self, conn: MuxConnection) -> None:
+        if not self._usable(conn):
+            self._discard(conn)
+
+    async def _connect(self, owner: object | None, timeout: float, *, trigger: str) -> MuxConnection:
+        ws = await self._connect_cb(owner, timeout)
+        if self._closed:
+            await ws.close()
+            raise APIStatusError("Murf AI multiplexer closed while connecting", retryable=True)
+        conn = MuxConnection(ws, max_contexts=self._max_contexts, max_queued=self._max_queued)
+        conn._on_idle = self._on_idle
+        self._connections.append(conn)
+        POOL_CONNECTIONS.inc()
+        POOL_CONNECTS.labels(trigger=trigger).inc()
+        return conn
+
+    # --------- Background sizing and refresh ---------
+    def _ensure_maintained(self) -> None:
+        if self._maintain_task is None and not self._closed:
+            self._maintain_task = asyncio.create_task(self._maintain())
+
+    async def _maintain(self) -> None:
+        while self._sessions or any(c.active for c in self._connections):
+            try:
+                await asyncio.wait_for(self._wake.wait(), self._maintain_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self._rebalance()
+            except Exception as e:
+                # a failed background connect is retried on the next round
+                logger.warning("could not warm Murf websockets: %s", e)
+
+        # every session was closed or garbage collected: nobody is left to keep sockets warm for
+        self._maintain_task = None
+        await self.aclose()
+
+    async def _rebalance(self) -> None:
+        self._pick()  # drops closed and idle expiring connections
+        target = self.target_connections()
+        missing = target - sum(1 for c in self._connections if self._usable(c))
+        for _ in range(missing):
+            async with self._connect_lock:
+                owner = self._latest_session()
+                if owner is None or sum(1 for c in self._connections if self._usable(c)) >= target:
+                    break
+                await self._connect(owner, self._connect_timeout, trigger="background")
+
+        # above target: close idle connections, oldest first
+        surplus = sum(1 for c in self._connections if self._usable(c)) - target
+        for conn in sorted(self._connections, key=lambda c: c.connected_at):
+            if surplus <= 0:
+                break
+            if self._usable(conn) and not conn.active:
+                self._discard(conn)
+                surplus -= 1
+
+    # --------- Contexts ---------
+    async def open_context(self, *, timeout: float, owner: object | None = None) -> MuxContext:
+        if owner is not None:
+            self.attach(owner)
+            self._ensure_maintained()
+
+        started = time.perf_counter()
+        conn = self._pick()
+        if conn is None:
+            async with self._connect_lock:
+                # another stream or the background task may have connected meanwhile
+                conn = self._pick() or await self._connect(owner, timeout, trigger="request")
+        POOL_WAIT.observe(time.perf_counter() - started)
+
+        ctx = conn.open_context()
+        if not any(c.has_capacity() for c in self._connections if self._usable(c)):
+            self._wake.set()  # the spare slot was used, warm the next connection now
+        return ctx
+
+    @asynccontextmanager
+    async def context(self, *, timeout: float, owner: object | None = None) -> AsyncIterator[MuxContext]:
+        ctx = await self.open_context(timeout=timeout, owner=owner)
+        try:
+            yield ctx
+        finally:
+            if ctx.done:
+                ctx.close()
+            else:
+                ctx.cancel()
+
+    def prewarm(self, owner: object | None = None) -> None:
+        """Open connections for the expected demand now instead of on the next check."""
+        if owner is not None:
+            self.attach(owner)
+            self._ensure_maintained()
+        self._wake.set()
+
+    async def aclose(self) -> None:
+        self._closed = True
+        if self._maintain_task is not None:
+            await utils.aio.gracefully_cancel(self._maintain_task)
+        connections, self._connections = self._connections, []
+        POOL_CONNECTIONS.dec(len(connections))
+        await asyncio.gather(
+            *(conn.aclose() for conn in connections), *self._closing, return_exceptions=True
+        )
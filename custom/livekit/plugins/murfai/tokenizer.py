@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import re
+from collections.abc import AsyncIterator
+
+from livekit.agents import tokenize
+
+# clause punctuation, only once the next character shows it is not inside a number ("1,000")
+_CLAUSE_END = re.compile(r"[,;:.!?—](?=\s)")
+
+
+class FirstClauseTokenizer(tokenize.SentenceTokenizer):
+    """
+    Sentence tokenizer that releases the first clause of each segment early.
+
+    Until the first clause is out, text is held here instead of in the wrapped
+    tokenizer, and released as soon as it reaches clause punctuation (with at least
+    `min_words` words) or `max_words` words. After that the wrapped tokenizer
+    produces whole sentences as usual. The clause goes through the wrapped stream
+    (push + flush), so tokens are always emitted in order.
+    """
+
+    def __init__(
+        self, sentence_tokenizer: tokenize.SentenceTokenizer, *, max_words: int, min_words: int = 2
+    ) -> None:
+        self._sentence_tokenizer = sentence_tokenizer
+        self._max_words = max_words
+        self._min_words = min_words
+
+    def tokenize(self, text: str, *, language: str | None = None) -> list[str]:
+        return self._sentence_tokenizer.tokenize(text, language=language)
+
+    def stream(self, *, language: str | None = None) -> tokenize.SentenceStream:
+        return FirstClauseStream(
+            self._sentence_tokenizer.stream(language=language),
+            max_words=self._max_words,
+            min_words=self._min_words,
+        )
+
+
+class FirstClauseStream(tokenize.SentenceStream):
+    def __init__(self, stream: tokenize.SentenceStream, *, max_words: int, min_words: int) -> None:
+        super().__init__()
+        self._stream = stream
+        self._max_words = max_words
+        self._min_words = min_words
+        self._buf = ""
+        self._clause_sent = False
+
+    def push_text(self, text: str) -> None:
+        self._check_not_closed()
+        if self._clause_sent:
+            self._stream.push_text(text)
+            return
+
+        self._buf += text
+        end = self._clause_end(self._buf)
+        if end is None:
+            return
+
+        clause, rest = self._buf[:end], self._buf[end:]
+        self._buf = ""
+        self._clause_sent = True
+        self._stream.push_text(clause)
+        self._stream.flush()
+        if rest:
+            self._stream.push_text(rest)
+
+    def flush(self) -> None:
+        self._check_not_closed()
+        if self._buf:
+            self._stream.push_text(self._buf)
+            self._buf = ""
+        self._stream.flush()
+        # the next segment starts with a fast first clause again
+        self._clause_sent = False
+
+    def end_input(self) -> None:
+        self.flush()
+        self._stream.end_input()
+        self._do_close()
+
+    async def aclose(self) -> None:
+        await self._stream.aclose()
+        self._do_close()
+
+    async def __anext__(self) -> tokenize.TokenData:
+        return await self._stream.__anext__()
+
+    def __aiter__(self) -> AsyncIterator[tokenize.TokenData]:
+        return self
+
+    def _clause_end(self, text: str) -> int | None:
+        """Index just past the first clause in `text`, or None if it is not complete yet."""
+        words = 0
+        for match in re.finditer(r"\S+", text):
+            if match.end() == len(text):
+                break  # the last word may still be growing
+            words += 1
+            if words >= self._max_words:
+                return match.end()
+            punct = _CLAUSE_END.search(text, match.start(), match.end() + 1)
+            if punct and words >= self._min_words:
+                return punct.end()
+        return None
@@ -1,9 +1,8 @@
 from __future__ import annotations
 
 import asyncio
-import base64
-import json
 import os
+import time
 import weakref
 from dataclasses import dataclass, replace
 from typing import Any
@@ -22,19 +21,56 @@ from livekit.agents import (
 from livekit.agents.types import DEFAULT_API_CONNECT_OPTIONS, NOT_GIVEN, NotGivenOr
 from livekit.agents.utils import is_given
 
+from .cache import AudioCache, voice_key
 from .log import logger
+from .metrics import CONNECT_TIME, ERRORS, RequestRecorder, connect_time_var, observe_tts_metrics
 from .models import (
     TTSDefaultVoiceId,
     TTSDefaultVoiceStyle,
     TTSEncoding,
     TTSLocales,
     TTSModels,
+    TTSSampleRates,
     TTSStyles,
 )
+from .mux import ContextMultiplexer, MuxContext
+from .tokenizer import FirstClauseTokenizer
 
 API_AUTH_HEADER = "api-key"
 BUFFERED_WORDS_COUNT = 10
 
+# AudioEmitter mime type per Murf format; anything but pcm goes through its streaming decoder
+ENCODING_MIME_TYPES = {"pcm": "audio/pcm", "mp3": "audio/mpeg", "ogg": "audio/ogg"}
+SAMPLE_RATES = (8000, 24000, 44100, 48000)
+
+_default_cache: AudioCache | None = None
+
+
+def default_audio_cache() -> AudioCache:
+    """Process-wide cache shared by TTS instances; MURF_AUDIO_CACHE_DIR adds the disk tier."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = AudioCache(
+            max_memory_bytes=int(os.environ.get("MURF_AUDIO_CACHE_MEMORY_MB", "32")) * 1024 * 1024,
+            disk_dir=os.environ.get("MURF_AUDIO_CACHE_DIR") or None,
+            max_disk_bytes=int(os.environ.get("MURF_AUDIO_CACHE_DISK_MB", "512")) * 1024 * 1024,
+        )
+    return _default_cache
+
+
+_multiplexers: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[str, ContextMultiplexer]] = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _shared_multiplexer(url: str, **kwargs: Any) -> ContextMultiplexer:
+    """One multiplexer per Murf endpoint and event loop, shared by every TTS instance using it."""
+    by_url = _multiplexers.setdefault(asyncio.get_running_loop(), {})
+    mux = by_url.get(url)
+    if mux is None or mux.closed:
+        mux = by_url[url] = ContextMultiplexer(connect_cb=TTS._connect_ws, **kwargs)
+    return mux
+
 
 @dataclass
 class _TTSOptions:
@@ -67,11 +103,15 @@ class TTS(tts.TTS):
         style: TTSStyles | str | None = None,
         speed: int | None = None,
         pitch: int | None = None,
-        sample_rate: int = 44100,
+        sample_rate: TTSSampleRates | int = 44100,
         encoding: TTSEncoding | str = "pcm",
         base_url: str = "https://api.murf.ai",
         http_session: aiohttp.ClientSession | None = None,
         tokenizer: NotGivenOr[tokenize.SentenceTokenizer] = NOT_GIVEN,
+        first_clause_words: int | None = BUFFERED_WORDS_COUNT,
+        audio_cache: NotGivenOr[AudioCache | None] = NOT_GIVEN,
+        max_contexts_per_connection: int = 8,
+        min_connections: int = 1,
     ) -> None:
         """
         Create a new instance of Murf AI TTS.
@@ -86,11 +126,15 @@ class TTS(tts.TTS):
             style (TTSStyles | str | None, optional): The voice style to apply (e.g., "Conversational"). Can be None for default style.
             speed (int | None, optional): The speech speed control. Higher values = faster speech. None for default speed.
             pitch (int | None, optional): The speech pitch control. Higher values = higher pitch. None for default pitch.
-            sample_rate (int, optional): The audio sample rate in Hz. Defaults to 44100.
-            encoding (str, optional): The audio encoding format. Defaults to "pcm".
+            sample_rate (int, optional): The audio sample rate in Hz, one of 8000, 24000, 44100 or 48000. Match it to the room's audio (24000 by default in LiveKit) to avoid resampling and halve pcm bandwidth. Defaults to 44100.
+            encoding (str, optional): The audio encoding format: "pcm", or "mp3"/"ogg" to receive compressed audio, decoded as it streams in. Defaults to "pcm".
             http_session (aiohttp.ClientSession | None, optional): An existing aiohttp ClientSession to use. If not provided, a new session will be created.
             base_url (str, optional): The base URL for the Murf AI API. Defaults to "https://api.murf.ai".
-            tokenizer (tokenize.SentenceTokenizer, optional): The tokenizer to use. Defaults to tokenize.basic.SentenceTokenizer(min_sentence_len=BUFFERED_WORDS_COUNT).
+            tokenizer (tokenize.SentenceTokenizer, optional): The tokenizer to use. Defaults to tokenize.blingfire.SentenceTokenizer().
+            first_clause_words (int | None, optional): Send the first clause of each segment as soon as it ends at a comma or reaches this many words, then whole sentences. Lowers time to first audio for long opening sentences. None waits for whole sentences. Defaults to BUFFERED_WORDS_COUNT.
+            audio_cache (AudioCache | None, optional): Cache of synthesized audio for the phrases registered with prewarm_cache, keyed on the text and all voice options. A stream whose whole text is a cached phrase is served locally without calling Murf. Defaults to the process-wide default_audio_cache(); None disables caching.
+            max_contexts_per_connection (int, optional): How many streams share one Murf websocket, each as its own Murf context. A new websocket is opened only when all open ones are full. Defaults to 8.
+            min_connections (int, optional): Websockets kept open and warm even without demand. More are opened in the background as sessions (TTS instances on the same endpoint) become active, and refreshed before they expire. The multiplexer is shared per endpoint, and its first TTS instance sets this and max_contexts_per_connection. Defaults to 1.
         """  # noqa: E501
 
         super().__init__(
@@ -99,6 +143,11 @@ class TTS(tts.TTS):
             num_channels=1,
         )
 
+        if encoding not in ENCODING_MIME_TYPES:
+            raise ValueError(f"unsupported encoding {encoding!r}, expected one of {list(ENCODING_MIME_TYPES)}")
+        if sample_rate not in SAMPLE_RATES:
+            raise ValueError(f"unsupported sample_rate {sample_rate}, expected one of {SAMPLE_RATES}")
+
         murf_api_key = api_key or os.environ.get("MURFAI_API_KEY")
         if not murf_api_key:
             raise ValueError("MURFAI_API_KEY must be set")
@@ -116,26 +165,47 @@ class TTS(tts.TTS):
             base_url=base_url,
         )
         self._session = http_session
-        self._pool = utils.ConnectionPool[aiohttp.ClientWebSocketResponse](
-            connect_cb=self._connect_ws,
-            close_cb=self._close_ws,
+        self._mux_options = dict(
+            max_contexts_per_connection=max_contexts_per_connection,
+            min_connections=min_connections,
             max_session_duration=300,
-            mark_refreshed_on_get=True,
         )
         self._streams = weakref.WeakSet[SynthesizeStream]()
         self._sentence_tokenizer = (
             tokenizer if is_given(tokenizer) else tokenize.blingfire.SentenceTokenizer()
         )
+        if first_clause_words:
+            self._sentence_tokenizer = FirstClauseTokenizer(
+                self._sentence_tokenizer, max_words=first_clause_words
+            )
 
-    async def _connect_ws(self, timeout: float) -> aiohttp.ClientWebSocketResponse:
-        session = self._ensure_session()
-        url = self._opts.get_ws_url(
+        self._audio_cache = default_audio_cache() if not is_given(audio_cache) else audio_cache
+
+        # LiveKit emits TTSMetrics for every request; they also feed the Prometheus histograms
+        self.on("metrics_collected", observe_tts_metrics)
+        self.on("error", self._on_error)
+
+    @property
+    def _mux(self) -> ContextMultiplexer:
+        return _shared_multiplexer(self._ws_url(), **self._mux_options)
+
+    def _ws_url(self) -> str:
+        return self._opts.get_ws_url(
             f"/v1/speech/stream-input?api-key={self._opts.api_key}&sample_rate={self._opts.sample_rate}&format={self._opts.encoding}"
         )
-        return await asyncio.wait_for(session.ws_connect(url), timeout)
 
-    async def _close_ws(self, ws: aiohttp.ClientWebSocketResponse) -> None:
-        await ws.close()
+    async def _connect_ws(self, timeout: float) -> aiohttp.ClientWebSocketResponse:
+        session = self._ensure_session()
+        started = time.perf_counter()
+        ws = await asyncio.wait_for(session.ws_connect(self._ws_url()), timeout)
+        connect_time = time.perf_counter() - started
+        CONNECT_TIME.observe(connect_time)
+        # read back by the stream that asked for a context, to tell a fresh socket from a warm one
+        connect_time_var.set(connect_time)
+        return ws
+
+    def _on_error(self, error: tts.TTSError) -> None:
+        ERRORS.labels(recoverable=str(error.recoverable).lower()).inc()
 
     def _ensure_session(self) -> aiohttp.ClientSession:
         if not self._session:
@@ -144,7 +214,35 @@ class TTS(tts.TTS):
         return self._session
 
     def prewarm(self) -> None:
-        self._pool.prewarm()
+        # called when a session starts, so its demand is forecast before it speaks
+        self._mux.prewarm(owner=self)
+
+    async def prewarm_cache(self, phrases: list[str], *, max_concurrency: int = 4) -> int:
+        """
+        Allow caching `phrases` for the current voice and synthesize the ones not cached yet.
+
+        Only phrases registered here are ever cached. Returns how many were added.
+        """
+        if self._audio_cache is None:
+            return 0
+        voice = voice_key(self._opts)
+        self._audio_cache.allow(phrases, voice)
+        missing = [p for p in dict.fromkeys(phrases) if not self._audio_cache.contains(p, voice)]
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def _synthesize(phrase: str) -> bool:
+            async with semaphore:
+                try:
+                    async with self.synthesize(phrase) as stream:
+                        async for _ in stream:
+                            pass
+                except Exception as e:
+                    logger.warning("could not prewarm %r: %s", phrase, e)
+                    return False
+            return self._audio_cache.contains(phrase, voice)
+
+        added = await asyncio.gather(*(_synthesize(p) for p in missing))
+        return sum(added)
 
     def update_options(
         self,
@@ -198,7 +296,9 @@ class TTS(tts.TTS):
             await stream.aclose()
 
         self._streams.clear()
-        await self._pool.aclose()
+        mux = self._mux
+        if mux.detach(self):
+            await mux.aclose()
 
 
 class ChunkedStream(tts.ChunkedStream):
@@ -210,6 +310,29 @@ class ChunkedStream(tts.ChunkedStream):
         self._opts = replace(tts._opts)
 
     async def _run(self, output_emitter: tts.AudioEmitter) -> None:
+        request_id = utils.shortuuid()
+        recorder = RequestRecorder(request_id, streamed=False, compressed=self._opts.encoding != "pcm")
+        recorder.text_received()
+
+        cache = self._tts._audio_cache
+        voice = voice_key(self._opts)
+        if cache is not None:
+            audio = await cache.aget(self._input_text, voice)
+            if audio is not None:
+                output_emitter.initialize(
+                    request_id=request_id,
+                    sample_rate=self._opts.sample_rate,
+                    num_channels=1,
+                    mime_type=ENCODING_MIME_TYPES[self._opts.encoding],
+                )
+                recorder.served_from_cache()
+                recorder.audio_received(len(audio))
+                output_emitter.push(audio)
+                output_emitter.flush()
+                recorder.finish()
+                return
+
+        parts: list[bytes] = []
         try:
             async with self._tts._ensure_session().post(
                 self._opts.get_http_url("/v1/speech/stream"),
@@ -230,16 +353,22 @@ class ChunkedStream(tts.ChunkedStream):
                 resp.raise_for_status()
 
                 output_emitter.initialize(
-                    request_id=utils.shortuuid(),
+                    request_id=request_id,
                     sample_rate=self._opts.sample_rate,
                     num_channels=1,
-                    mime_type="audio/pcm",
+                    mime_type=ENCODING_MIME_TYPES[self._opts.encoding],
                 )
 
                 async for data, _ in resp.content.iter_chunks():
+                    recorder.audio_received(len(data))
                     output_emitter.push(data)
+                    parts.append(data)
 
                 output_emitter.flush()
+                recorder.audio_done()
+
+            if cache is not None and cache.allows(self._input_text, voice):
+                await cache.aput(self._input_text, voice, b"".join(parts))
         except asyncio.TimeoutError:
             raise APITimeoutError() from None
         except aiohttp.ClientResponseError as e:
@@ -248,6 +377,8 @@ class ChunkedStream(tts.ChunkedStream):
             ) from None
         except Exception as e:
             raise APIConnectionError() from e
+        finally:
+            recorder.finish()
 
 
 class SynthesizeStream(tts.SynthesizeStream):
@@ -263,72 +394,114 @@ class SynthesizeStream(tts.SynthesizeStream):
             request_id=request_id,
             sample_rate=self._opts.sample_rate,
             num_channels=1,
-            mime_type="audio/pcm",
+            mime_type=ENCODING_MIME_TYPES[self._opts.encoding],
             stream=True,
         )
+        recorder = RequestRecorder(request_id, streamed=True, compressed=self._opts.encoding != "pcm")
+
+        cache = self._tts._audio_cache
+        voice = voice_key(self._opts)
+        # input read while it can still be a cached phrase, replayed to Murf if it is not
+        pending: list[str | SynthesizeStream._FlushSentinel] = []
+        text = ""
+        input_ended = False
+        if cache is not None:
+            while cache.may_match(text, voice):
+                try:
+                    data = await self._input_ch.recv()
+                except utils.aio.ChanClosed:
+                    input_ended = True
+                    break
+                pending.append(data)
+                if not isinstance(data, self._FlushSentinel):
+                    recorder.text_received()
+                    text += data
 
-        async def _sentence_stream_task(ws: aiohttp.ClientWebSocketResponse) -> None:
-            context_id = utils.shortuuid()
-            base_pkt = _to_murf_websocket_pkt(self._opts)
+            audio = await cache.aget(text, voice) if input_ended and text.strip() else None
+            if audio is not None:
+                self._mark_started()
+                output_emitter.start_segment(segment_id=utils.shortuuid())
+                recorder.served_from_cache()
+                recorder.audio_received(len(audio))
+                output_emitter.push(audio)
+                output_emitter.end_input()
+                recorder.finish()
+                return
+
+        # the stream text and audio, while short enough to cache
+        cache_text: list[str] = []
+        cache_audio: list[bytes] = []
+        cacheable = cache is not None
+
+        async def _sentence_stream_task(mux_ctx: MuxContext) -> None:
+            voice_config = _to_murf_websocket_pkt(self._opts)["voice_config"]
             async for ev in self._sent_tokenizer_stream:
-                token_pkt = base_pkt.copy()
-                token_pkt["context_id"] = context_id
-                token_pkt["text"] = ev.token + " "
+                recorder.text_sent()
                 self._mark_started()
-                await ws.send_str(json.dumps(token_pkt))
+                await mux_ctx.send_text(voice_config, ev.token + " ")
 
-            end_pkt = base_pkt.copy()
-            end_pkt["context_id"] = context_id
-            end_pkt["end"] = True
-            await ws.send_str(json.dumps(end_pkt))
+            await mux_ctx.end(voice_config)
 
-        async def _input_task() -> None:
-            async for data in self._input_ch:
-                if isinstance(data, self._FlushSentinel):
-                    self._sent_tokenizer_stream.flush()
-                    continue
+        def _push_input(data: str | SynthesizeStream._FlushSentinel) -> None:
+            nonlocal cacheable
+            if isinstance(data, self._FlushSentinel):
+                self._sent_tokenizer_stream.flush()
+                return
 
-                self._sent_tokenizer_stream.push_text(data)
+            recorder.text_received()
+            self._sent_tokenizer_stream.push_text(data)
+            if cacheable:
+                cache_text.append(data)
+                cacheable = sum(map(len, cache_text)) <= cache.max_text_chars
+
+        async def _input_task() -> None:
+            for data in pending:
+                _push_input(data)
+            if not input_ended:
+                async for data in self._input_ch:
+                    _push_input(data)
 
             self._sent_tokenizer_stream.end_input()
 
-        async def _recv_task(ws: aiohttp.ClientWebSocketResponse) -> None:
-            current_segment_id: str | None = None
-            while True:
-                msg = await ws.receive()
-                if msg.type in (
-                    aiohttp.WSMsgType.CLOSED,
-                    aiohttp.WSMsgType.CLOSE,
-                    aiohttp.WSMsgType.CLOSING,
-                ):
-                    raise APIStatusError(
-                        "Murf AI connection closed unexpectedly", request_id=request_id
-                    )
-
-                if msg.type != aiohttp.WSMsgType.TEXT:
-                    logger.warning("unexpected Murf AI message type %s", msg.type)
-                    continue
-
-                data = json.loads(msg.data)
-                segment_id = data.get("context_id")
-                if current_segment_id is None:
-                    current_segment_id = segment_id
-                    output_emitter.start_segment(segment_id=current_segment_id)
-                if data.get("audio"):
-                    b64data = base64.b64decode(data["audio"])
-                    output_emitter.push(b64data)
-                elif data.get("final"):
+        async def _recv_task(mux_ctx: MuxContext) -> None:
+            output_emitter.start_segment(segment_id=mux_ctx.context_id)
+            # the connection routes only this context's messages here
+            async for data in mux_ctx:
+                if data.audio:
+                    if recorder.audio_received(len(data.audio)) and recorder.first_send_at:
+                        # time to first audio, split into waiting for the tokenizer and for Murf
+                        now = recorder.first_audio_at
+                        logger.debug(
+                            "murf time to first audio",
+                            extra={
+                                "request_id": request_id,
+                                "ttfa": round(now - recorder.first_text_at, 3),
+                                "tokenizer_wait": round(recorder.first_send_at - recorder.first_text_at, 3),
+                                "ttfb": round(now - recorder.first_send_at, 3),
+                            },
+                        )
+                    if cacheable:
+                        cache_audio.append(data.audio)
+                    # the emitter re-frames (or decodes) the chunks itself
+                    output_emitter.push(data.audio)
+                elif data.final:
+                    recorder.audio_done()
                     output_emitter.end_input()
-                    break
+                    # only phrases registered with prewarm_cache are written back
+                    if cacheable and cache_audio and cache.allows("".join(cache_text), voice):
+                        await cache.aput("".join(cache_text), voice, b"".join(cache_audio))
                 else:
                     logger.warning("unexpected message %s", data)
 
         try:
-            async with self._tts._pool.connection(timeout=self._conn_options.timeout) as ws:
+            async with self._tts._mux.context(
+                timeout=self._conn_options.timeout, owner=self._tts
+            ) as mux_ctx:
+                recorder.connected()
                 tasks = [
                     asyncio.create_task(_input_task()),
-                    asyncio.create_task(_sentence_stream_task(ws)),
-                    asyncio.create_task(_recv_task(ws)),
+                    asyncio.create_task(_sentence_stream_task(mux_ctx)),
+                    asyncio.create_task(_recv_task(mux_ctx)),
                 ]
 
                 try:
@@ -343,6 +516,8 @@ class SynthesizeStream(tts.SynthesizeStream):
             ) from None
         except Exception as e:
             raise APIConnectionError() from e
+        finally:
+            recorder.finish()
 
 
 def _to_murf_websocket_pkt(opts: _TTSOptions) -> dict[str, Any]:
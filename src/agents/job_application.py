@@ -1,9 +1,12 @@
+import asyncio
 import logging
 import json
+import os
 import uuid
 from custom.livekit.plugins import murfai
 from pathlib import Path
-from livekit.agents import JobContext, WorkerOptions, cli
+import aiohttp
+from livekit.agents import JobContext, JobProcess, WorkerOptions, cli
 from livekit.agents.voice import Agent, AgentSession, room_io
 from livekit.plugins import openai, silero, assemblyai
 from livekit.plugins import noise_cancellation
@@ -30,6 +33,57 @@ async def send_text(room: rtc.Room, text: str):
         reliable=True,
         topic="transcripts",
     )
+
+
+# Fixed lines the agent says often; synthesized once per process and then served from the Murf audio cache
+CACHED_PHRASES = [
+    "Hello! How can I help you today?",
+    "Would you like to apply through me, or handle the process yourself?",
+    "Could you please share the job ID and your email address?",
+    "Do you know your application ID?",
+    "Is there anything else I can help you with?",
+    "Thank you! Have a great day.",
+    f"The open positions are: {', '.join(job['title'] for job in OPEN_JOBS)}.",
+]
+# LiveKit fails a job process whose prewarm runs past initialize_process_timeout (10 s)
+CACHE_PREWARM_TIMEOUT = float(os.getenv("MURF_CACHE_PREWARM_TIMEOUT", "8"))
+
+
+def make_tts(**kwargs) -> murfai.TTS:
+    """The agent's Murf voice; the cache prewarm must use the same options to produce hits."""
+    return murfai.TTS(
+        voice="en-US-natalie",           # Use Amara voice
+        style="Conversational",       # Conversational style
+        locale="en-US",                # US English
+        sample_rate=24000,             # the room's output rate, no resampling
+        encoding=os.getenv("MURF_ENCODING", "pcm"),  # "mp3"/"ogg" to cut bandwidth
+        **kwargs,
+    )
+
+
+def prewarm_audio_cache(proc: JobProcess) -> None:
+    """
+    WorkerOptions.prewarm_fnc: fill the Murf audio cache once per job process, before its
+    first room. With MURF_AUDIO_CACHE_DIR set, phrases already on disk are not synthesized
+    again, so the whole host pays for them once.
+    """
+
+    async def _prewarm() -> int:
+        async with aiohttp.ClientSession() as session:
+            tts = make_tts(http_session=session)
+            try:
+                return await asyncio.wait_for(tts.prewarm_cache(CACHED_PHRASES), CACHE_PREWARM_TIMEOUT)
+            finally:
+                await tts.aclose()
+
+    try:
+        added = asyncio.run(_prewarm())
+        logger.info(f"✅ Murf audio cache prewarmed, {added} phrases synthesized")
+    except Exception as e:
+        # the agent still works, the phrases just go to Murf like any other text
+        logger.warning(f"⚠️ Could not prewarm the Murf audio cache: {e!r}")
+
+
 # ------------------------
 # Agent Definition
 # ------------------------
@@ -91,11 +145,7 @@ class JobApplicationAgent(Agent):
             stt=assemblyai.STT(),
             llm=openai.LLM(model="gpt-4o-2024-08-06"),
             # tts=openai.TTS(model="gpt-4o-mini-tts", voice="ash"),
-            tts=murfai.TTS(
-                voice="en-US-natalie",           # Use Amara voice
-                style="Conversational",       # Conversational style
-                locale="en-US"                 # US English
-            ),
+            tts=make_tts(),
             vad=silero.VAD.load(min_speech_duration=0.1),
 
             tools=[check_existing_application, create_job_application, check_application_status,query_knowledge_base],
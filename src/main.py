@@ -1,35 +1,19 @@
 import logging
-import asyncio
+import os
+from custom.livekit.plugins import murfai
 from livekit.agents import JobContext, WorkerOptions, cli
 from livekit.agents.voice import AgentSession, room_io
 from livekit.plugins import noise_cancellation
-from src.agents.job_application import JobApplicationAgent
+from src.agents.job_application import JobApplicationAgent, prewarm_audio_cache
+from src.utils.updater_service import get_updater_service
 from dotenv import load_dotenv
 
-
-# import your updater function
-from src.utils.update_applications import update_applications
-
 load_dotenv()
 
 logger = logging.getLogger("murf-voice-agent")
 logger.setLevel(logging.INFO)
 
 
-# ------------------------
-# Background updater task
-# ------------------------
-async def run_updater(interval: int = 30):
-    """Run the updater every `interval` seconds (default = 30s)."""
-    while True:
-        try:
-            logger.info("🔄 Running application updater...")
-            update_applications()  # your function
-        except Exception as e:
-            logger.error(f"Updater failed: {e}")
-        await asyncio.sleep(interval)
-
-
 # ------------------------
 # Entry Point
 # ------------------------
@@ -38,11 +22,19 @@ async def entrypoint(ctx: JobContext):
 
     session = AgentSession()
 
-    # Start updater in the background (defaults to 30s)
-    asyncio.create_task(run_updater())
+    # One updater per host, shared by every session on this loop; stops when the last one ends
+    updater = get_updater_service()
+    await updater.acquire()
+    ctx.add_shutdown_callback(updater.release)
+
+    # AgentSession never closes the agent's TTS; closing it with the job releases this
+    # job's share of the pooled Murf websockets
+    agent = JobApplicationAgent()
+    if isinstance(agent.tts, murfai.TTS):
+        ctx.add_shutdown_callback(agent.tts.aclose)
 
     await session.start(
-        agent=JobApplicationAgent(),
+        agent=agent,
         room_input_options=room_io.RoomInputOptions(
             noise_cancellation=noise_cancellation.BVC()
         ),
@@ -51,4 +43,9 @@ async def entrypoint(ctx: JobContext):
 
 
 if __name__ == "__main__":
-    cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint))
+    # Murf TTS latency/throughput metrics of all job processes on :MURF_METRICS_PORT/metrics;
+    # started before the worker so its job processes share the multiprocess directory
+    if os.getenv("MURF_METRICS_PORT"):
+        murfai.start_metrics_server(int(os.getenv("MURF_METRICS_PORT")))
+
+    cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint, prewarm_fnc=prewarm_audio_cache))
@@ -1,16 +1,17 @@
+import asyncio
 import logging
 from typing import List
-import json
 import uuid
-from pathlib import Path
 from livekit.agents import JobContext, WorkerOptions, cli, function_tool
 from livekit.agents.voice import Agent, AgentSession, room_io
 from livekit.plugins import openai, silero, assemblyai
 from livekit.plugins import noise_cancellation
 from dotenv import load_dotenv
-from src.utils.retriever import Retriever
+from src.utils.application_store import ApplicationConflict, get_application_store
+from src.utils.retriever import get_retriever
 
-# Initialize retriever (ensure index is already built or loaded)
+# Retriever is shared per worker process (ensure index is already built)
+KNOWLEDGE_BASE_TIMEOUT = 5.0  # seconds; a slow lookup must not hold up the voice pipeline
 
 @function_tool(
     description="""
@@ -29,11 +30,13 @@ async def query_knowledge_base(query: str) -> str:
     The response is used by the agent to provide job-related answers.
     """
     try:
-        retriever = Retriever()
+        retriever = get_retriever()
 
-        response = retriever.query(query,top_k=5)
+        response = await retriever.aquery(query, top_k=5, timeout=KNOWLEDGE_BASE_TIMEOUT)
         print(f"Knowledge Base Response: {response}")
-        return response  # LlamaIndex returns a Response object
+        return response
+    except asyncio.TimeoutError:
+        return "❌ Knowledge base lookup timed out."
     except Exception as e:
         return f"❌ Error querying index: {e}"
 
@@ -62,30 +65,19 @@ async def check_application_status(
     email: str | None = None,
     job_id: str | None = None,
 ) -> list[dict]:
-    import re
-
-    out_dir = Path("data/applications")
-    if not out_dir.exists():
-        return []
-
-    results = []
+    store = get_application_store()
 
     # Case 1: Lookup by application_id
     if application_id:
-        for file in out_dir.glob(f"*_{application_id}.json"):
-            with open(file, "r") as f:
-                return [json.load(f)]
+        application = await store.aget(application_id)
+        if application:
+            return [application]
 
     # Case 2: Lookup by email + job_id
     if email and job_id:
-        normalized_email = re.sub(r"[^a-zA-Z0-9]", "_", email.strip().lower())
-        normalized_job_id = job_id.strip().lower()
-
-        for file in out_dir.glob(f"{normalized_job_id}_{normalized_email}_*.json"):
-            with open(file, "r") as f:
-                results.append(json.load(f))
+        return await store.afind(job_id, email)
 
-    return results
+    return []
 
 
 
@@ -103,18 +95,9 @@ async def check_application_status(
     """
 )
 async def check_existing_application(job_id: str, email: str) -> str | None:
-    import re
-
-    normalized_job_id = job_id.strip().lower()
-    normalized_email = re.sub(r"[^a-zA-Z0-9]", "_", email.strip().lower())
-
-    out_dir = Path("data/applications")
-    out_dir.mkdir(exist_ok=True)
-
-    for file in out_dir.glob(f"{normalized_job_id}_{normalized_email}_*.json"):
-        with open(file, "r") as f:
-            existing_application = json.load(f)
-        return existing_application["application_id"]
+    existing_applications = await get_application_store().afind(job_id, email)
+    if existing_applications:
+        return existing_applications[0]["application_id"]
 
     return None
 
@@ -139,7 +122,6 @@ async def create_job_application(
     job_id: str, name: str, dob: str, email: str, skills: list[str], experience: str
 ) -> str:
     from datetime import datetime
-    import re
 
     # Validate job_id
     selected_job = next(
@@ -155,17 +137,6 @@ async def create_job_application(
     except ValueError:
         return "❌ Invalid DOB format. Please provide in dd-mm-yyyy format."
 
-    normalized_job_id = selected_job["job_id"].lower()
-    normalized_email = re.sub(r"[^a-zA-Z0-9]", "_", email.strip().lower())
-
-    out_dir = Path("data/applications")
-    out_dir.mkdir(exist_ok=True)
-
-    # Prevent duplicate application for the same job_id + email
-    existing_id = await check_existing_application(job_id, email)
-    if existing_id:
-        return f"⚠️ You have already applied for '{selected_job['title']}'. Your application ID is {existing_id}."
-
     # Generate unique application ID
     application_id = str(uuid.uuid4())
 
@@ -185,11 +156,12 @@ async def create_job_application(
         "reapply_possible": "",
     }
 
-    # Filename format: jobid_email_appid.json
-    filename = f"{normalized_job_id}_{normalized_email}_{application_id}.json"
-    filepath = out_dir / filename
-
-    with open(filepath, "w") as f:
-        json.dump(application, f, indent=2)
+    # Atomic create-if-absent on (job_id, email), so concurrent or retried submits cannot duplicate
+    try:
+        stored, filepath = await get_application_store().acreate_if_absent(application)
+    except ApplicationConflict:
+        return f"⚠️ An application for '{selected_job['title']}' is already being submitted. Please check its status in a moment."
+    if filepath is None:
+        return f"⚠️ You have already applied for '{selected_job['title']}'. Your application ID is {stored['application_id']}."
 
     return f"✅ Application submitted for '{selected_job['title']}'! Your application ID is {application_id}. Saved at {filepath}"
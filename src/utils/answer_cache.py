@@ -0,0 +1,91 @@
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+class SemanticAnswerCache:
+    """
+    Caches knowledge-base contexts by query embedding.
+
+    A lookup hits when a cached query with the same `top_k` lies within `max_distance`
+    cosine distance of the new query. Entries belong to one index generation; the whole
+    cache is dropped as soon as it sees a different generation.
+    """
+
+    def __init__(self, max_distance: float = 0.05, max_entries: int = 512):
+        self.max_distance = max_distance
+        self.max_entries = max_entries
+        self.generation: Optional[str] = None
+        self.hits = 0
+        self.misses = 0
+
+        # key -> (unit vector, top_k, context); the stacked matrix is rebuilt lazily
+        self._entries: "OrderedDict[int, Tuple[np.ndarray, int, str]]" = OrderedDict()
+        self._matrix: Optional[np.ndarray] = None
+        self._keys: List[int] = []
+        self._next_key = 0
+        self._lock = threading.Lock()
+
+    def lookup(self, embedding: List[float], top_k: int, generation: Optional[str]) -> Optional[str]:
+        vector = _unit(embedding)
+
+        with self._lock:
+            self._check_generation(generation)
+
+            if self._entries:
+                if self._matrix is None:
+                    self._keys = list(self._entries)
+                    self._matrix = np.stack([self._entries[k][0] for k in self._keys])
+
+                distances = 1.0 - self._matrix @ vector
+                for i in np.argsort(distances):
+                    if distances[i] > self.max_distance:
+                        break
+                    key = self._keys[i]
+                    _, cached_top_k, context = self._entries[key]
+                    if cached_top_k == top_k:
+                        self._entries.move_to_end(key)
+                        self.hits += 1
+                        return context
+
+            self.misses += 1
+            return None
+
+    def store(self, embedding: List[float], top_k: int, context: str, generation: Optional[str]):
+        with self._lock:
+            self._check_generation(generation)
+
+            self._entries[self._next_key] = (_unit(embedding), top_k, context)
+            self._next_key += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._matrix = None
+
+    def invalidate(self):
+        with self._lock:
+            self._entries.clear()
+            self._matrix = None
+
+    def _check_generation(self, generation: Optional[str]):
+        if generation != self.generation:
+            self._entries.clear()
+            self._matrix = None
+            self.generation = generation
+
+    def stats(self) -> Dict[str, float]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "size": len(self._entries),
+            "max_distance": self.max_distance,
+        }
+
+
+def _unit(embedding: List[float]) -> np.ndarray:
+    vector = np.asarray(embedding, dtype="float32")
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
@@ -0,0 +1,550 @@
+import asyncio
+import fcntl
+import os
+import queue
+import re
+import socket
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from src.utils import codec
+from src.utils.atomic_write import atomic_write_many
+
+APPLICATIONS_DIR = "data/applications"
+APPLICATIONS_DB = "data/applications.db"
+
+# Bounded pool the async methods run on, so store I/O never blocks the event loop
+_STORE_THREADS = int(os.getenv("APPLICATION_STORE_THREADS", "4"))
+_store_executor = ThreadPoolExecutor(max_workers=_STORE_THREADS, thread_name_prefix="application-store")
+
+
+def normalize_email(email: str) -> str:
+    return re.sub(r"[^a-zA-Z0-9]", "_", email.strip().lower())
+
+
+def application_key(job_id: str, email: str) -> Tuple[str, str]:
+    """Uniqueness key of an application: (lowercased job_id, normalized email)."""
+    return job_id.strip().lower(), normalize_email(email)
+
+
+class ApplicationConflict(RuntimeError):
+    """Another writer is still creating the application for this (job_id, email)."""
+
+
+class ApplicationStore:
+    """
+    Storage backend for job applications.
+
+    Backends implement the blocking methods; the `a*` variants run them on a bounded
+    thread pool for use from async tools.
+    """
+
+    def get(self, application_id: str) -> Optional[dict]:
+        raise NotImplementedError
+
+    def find(self, job_id: str, email: str) -> List[dict]:
+        raise NotImplementedError
+
+    def iter_applications(self) -> Iterator[dict]:
+        raise NotImplementedError
+
+    def application_ids(self) -> List[str]:
+        raise NotImplementedError
+
+    def add(self, application: dict) -> str:
+        """Store a new application and return where it was saved."""
+        raise NotImplementedError
+
+    def save(self, application: dict):
+        """Overwrite an existing application."""
+        raise NotImplementedError
+
+    def create_if_absent(self, application: dict) -> Tuple[dict, Optional[str]]:
+        """
+        Atomically store `application` unless one exists for its (job_id, email).
+
+        Returns the stored application and where it was saved, or the existing
+        application and None. Safe against concurrent sessions and worker processes.
+        """
+        raise NotImplementedError
+
+    def save_many(self, applications: Iterable[dict]):
+        for application in applications:
+            self.save(application)
+
+    async def aget(self, application_id: str) -> Optional[dict]:
+        return await self._run(self.get, application_id)
+
+    async def afind(self, job_id: str, email: str) -> List[dict]:
+        return await self._run(self.find, job_id, email)
+
+    async def aadd(self, application: dict) -> str:
+        return await self._run(self.add, application)
+
+    async def asave(self, application: dict):
+        return await self._run(self.save, application)
+
+    async def acreate_if_absent(self, application: dict) -> Tuple[dict, Optional[str]]:
+        return await self._run(self.create_if_absent, application)
+
+    @staticmethod
+    async def _run(fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(_store_executor, fn, *args)
+
+
+class JsonApplicationStore(ApplicationStore):
+    """
+    Application JSON files in `app_dir`, with in-memory indexes for O(1) lookups.
+
+    Files are named `{job_id}_{email}_{application_id}.json`, so the indexes by
+    application_id and by (job_id, normalized email) are built from one directory
+    listing without opening any file. Names never change after create, so a hit is
+    served from the index as is; the directory is only rescanned when a lookup misses
+    (or a full listing is asked for) and its mtime changed since the last scan, which
+    is how files created by other worker processes are picked up. Writes through the
+    store keep the indexes up to date. Files are replaced atomically (temp file +
+    rename), so readers never see a partially written application.
+
+    Uniqueness per (job_id, email) is claimed with an exclusive-create marker file in
+    `.keys/`, which holds the application_id of the winner and the host, pid and time
+    of the process writing it. A marker is reclaimed once that process is known to be
+    dead, or after MARKER_MAX_AGE_SECONDS without its application; until then a second
+    submit is reported as an ApplicationConflict.
+    """
+
+    # how long a second submit waits for the first writer before giving up with a conflict
+    MARKER_WAIT_SECONDS = 5.0
+    # a marker still without its application after this long is reclaimed whoever owns it:
+    # covers owners on other hosts, reused pids and writers that died before writing it
+    MARKER_MAX_AGE_SECONDS = 600
+
+    def __init__(self, app_dir: str = APPLICATIONS_DIR):
+        self.app_dir = Path(app_dir)
+        self.app_dir.mkdir(parents=True, exist_ok=True)
+        self.keys_dir = self.app_dir / ".keys"
+        self.keys_dir.mkdir(exist_ok=True)
+
+        self._by_id: Dict[str, Path] = {}
+        self._by_key: Dict[Tuple[str, str], List[str]] = {}
+        self._dir_mtime: Optional[int] = None
+        self._lock = threading.RLock()
+
+    # --------- Lookups ---------
+    def get(self, application_id: str) -> Optional[dict]:
+        path = self._path(application_id.strip())
+        return self._read(path) if path else None
+
+    def find(self, job_id: str, email: str) -> List[dict]:
+        key = application_key(job_id, email)
+        application_ids = self._by_key.get(key)
+        if not application_ids:
+            self._refresh()  # possibly created by another process since the last scan
+            application_ids = self._by_key.get(key, [])
+        return [app for app in (self._read(self._by_id[i]) for i in list(application_ids)) if app]
+
+    def iter_applications(self) -> Iterator[dict]:
+        self._refresh()
+        for path in list(self._by_id.values()):
+            application = self._read(path)
+            if application:
+                yield application
+
+    def application_ids(self) -> List[str]:
+        self._refresh()
+        return list(self._by_id)
+
+    # --------- Writes ---------
+    def add(self, application: dict) -> str:
+        """Write a new application file and index it."""
+        job_id, email = application_key(application["job_id"], application["email"])
+        path = self.app_dir / f"{job_id}_{email}_{application['application_id']}.json"
+
+        with self._lock:
+            self._write([(path, application)])
+            self._index(path, self._by_id, self._by_key)
+        return str(path)
+
+    def save(self, application: dict):
+        """Replace an existing application."""
+        self.save_many([application])
+
+    def save_many(self, applications: Iterable[dict]):
+        """Replace existing applications, with one fsync pass for the whole batch."""
+        items = []
+        for application in applications:
+            path = self._path(application["application_id"])
+            if path is None:
+                raise KeyError(f"Unknown application {application['application_id']}")
+            items.append((path, application))
+
+        if items:
+            with self._lock:
+                self._write(items)
+
+    def create_if_absent(self, application: dict) -> Tuple[dict, Optional[str]]:
+        job_id, email = application_key(application["job_id"], application["email"])
+        marker = self.keys_dir / f"{job_id}_{email}"
+
+        while True:
+            # applications from before markers existed are only known to the index
+            existing = self.find(job_id, email)
+            if existing:
+                return existing[0], None
+
+            try:
+                fd = os.open(marker, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+            except FileExistsError:
+                winner = self._wait_for_marker(marker)
+                if winner is not None:
+                    return winner, None
+                continue  # the owner died before writing its application, try to claim it again
+
+            owner = {
+                "application_id": application["application_id"],
+                "host": socket.gethostname(),
+                "pid": os.getpid(),
+                "ts": time.time(),
+            }
+            with os.fdopen(fd, "wb") as f:
+                f.write(codec.dumps(owner))
+            try:
+                return application, self.add(application)
+            except BaseException:
+                # we are alive, so nobody else would reclaim the marker before it ages out
+                with self._marker_lock():
+                    if (self._read_marker(marker) or {}).get("application_id") == owner["application_id"]:
+                        marker.unlink(missing_ok=True)
+                raise
+
+    def _wait_for_marker(self, marker: Path) -> Optional[dict]:
+        """
+        Return the application that claimed `marker`, or None once the marker is gone.
+
+        Raises ApplicationConflict if the owner may still be writing and has not written
+        its application within MARKER_WAIT_SECONDS.
+        """
+        deadline = time.monotonic() + self.MARKER_WAIT_SECONDS
+        while True:
+            owner = self._read_marker(marker)
+            if owner is None:
+                return None
+
+            application_id = owner.get("application_id")
+            application = self.get(application_id) if application_id else None
+            if application is not None:
+                return application
+            if self._is_abandoned(marker, owner) and self._reclaim_marker(marker):
+                return None
+            if time.monotonic() > deadline:
+                raise ApplicationConflict(
+                    f"{marker.name} is held by pid {owner.get('pid')} on {owner.get('host')}, "
+                    f"which has not written application {application_id} yet"
+                )
+            time.sleep(0.05)
+
+    @staticmethod
+    def _read_marker(marker: Path) -> Optional[dict]:
+        """The marker's owner record, {} while it is being written, None if it is gone."""
+        try:
+            data = marker.read_bytes()
+        except FileNotFoundError:
+            return None
+        try:
+            return codec.loads(data) if data.strip() else {}
+        except codec.DECODE_ERRORS:
+            return {}  # torn write of a writer that died mid-way; aged out by mtime
+
+    def _is_abandoned(self, marker: Path, owner: dict) -> bool:
+        """Whether the owner is dead, or the marker is too old for any writer to still be busy."""
+        if self._owner_is_dead(owner):
+            return True
+        # an empty marker has no ts yet: its writer died between the create and the write
+        created_at = owner.get("ts")
+        if created_at is None:
+            try:
+                created_at = marker.stat().st_mtime
+            except FileNotFoundError:
+                return True
+        return time.time() - created_at > self.MARKER_MAX_AGE_SECONDS
+
+    @staticmethod
+    def _owner_is_dead(owner: dict) -> bool:
+        # only a process on this host can be checked; a reused pid looks alive, which the age limit covers
+        if owner.get("host") != socket.gethostname() or not owner.get("pid"):
+            return False
+        try:
+            os.kill(owner["pid"], 0)
+        except ProcessLookupError:
+            return True
+        except PermissionError:
+            return False  # exists, owned by another user
+        return False
+
+    @contextmanager
+    def _marker_lock(self) -> Iterator[None]:
+        # held by anyone removing a marker, so a check and the unlink after it cannot race
+        # another removal followed by a fresh claim
+        with open(self.keys_dir / ".reclaim.lock", "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            yield
+
+    def _reclaim_marker(self, marker: Path) -> bool:
+        """Remove `marker` if it is still abandoned; True once it is gone."""
+        with self._marker_lock():
+            owner = self._read_marker(marker)
+            if owner is None:
+                return True
+            if not self._is_abandoned(marker, owner):
+                return False
+            marker.unlink(missing_ok=True)
+            return True
+
+    # --------- Internals ---------
+    def _path(self, application_id: str) -> Optional[Path]:
+        path = self._by_id.get(application_id)
+        if path is None:
+            self._refresh()  # possibly created by another process since the last scan
+            path = self._by_id.get(application_id)
+        return path
+
+    def _refresh(self):
+        if self._dir_mtime_ns() == self._dir_mtime:
+            return
+
+        with self._lock:
+            mtime = self._dir_mtime_ns()
+            if mtime == self._dir_mtime:
+                return
+            # build aside and swap, so concurrent readers never see a half-built index
+            by_id: Dict[str, Path] = {}
+            by_key: Dict[Tuple[str, str], List[str]] = {}
+            with os.scandir(self.app_dir) as entries:
+                for entry in entries:
+                    if entry.name.endswith(".json"):
+                        self._index(Path(entry.path), by_id, by_key)
+            self._by_id, self._by_key = by_id, by_key
+            self._dir_mtime = mtime
+
+    @staticmethod
+    def _index(path: Path, by_id: Dict[str, Path], by_key: Dict[Tuple[str, str], List[str]]):
+        # {job_id}_{email}_{application_id}: job ids have no "_", uuids have none either
+        try:
+            job_id, rest = path.stem.split("_", 1)
+            email, application_id = rest.rsplit("_", 1)
+        except ValueError:
+            return
+        if application_id not in by_id:
+            by_key.setdefault((job_id, email), []).append(application_id)
+        by_id[application_id] = path
+
+    def _dir_mtime_ns(self) -> Optional[int]:
+        try:
+            return self.app_dir.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    @staticmethod
+    def _read(path: Path) -> Optional[dict]:
+        try:
+            with open(path, "rb") as f:
+                return codec.loads_application(f.read())
+        except FileNotFoundError:
+            return None
+
+    def _write(self, items: List[Tuple[Path, dict]]):
+        # our own files are indexed by the caller; the directory mtime is left to _refresh,
+        # since another process may rename a file in between our write and any stat
+        atomic_write_many(items)
+
+
+class SqliteApplicationStore(ApplicationStore):
+    """
+    Applications in one SQLite database in WAL mode.
+
+    Readers never block the writer, so concurrent sessions and worker processes can
+    look up applications while the updater writes. Lookups by application_id, email
+    and (job_id, email) are served by indexes. Connections come from a small pool
+    sized to the store's thread pool.
+    """
+
+    def __init__(self, db_path: str = APPLICATIONS_DB, pool_size: Optional[int] = None):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        pool_size = pool_size or _STORE_THREADS
+        self._pool: "queue.Queue[sqlite3.Connection]" = queue.Queue()
+        for _ in range(pool_size):
+            self._pool.put(self._connect())
+
+        with self._connection() as conn:
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS applications (
+                    application_id TEXT PRIMARY KEY,
+                    job_id TEXT NOT NULL,
+                    email_key TEXT NOT NULL,
+                    data TEXT NOT NULL,
+                    updated_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_applications_email ON applications (email_key);
+                """
+            )
+            try:
+                conn.execute(
+                    "CREATE UNIQUE INDEX IF NOT EXISTS uq_applications_job_email ON applications (job_id, email_key)"
+                )
+            except sqlite3.IntegrityError:
+                # older duplicates; create_if_absent still serializes writers with BEGIN IMMEDIATE
+                print("⚠️ Duplicate applications in the database, (job_id, email) is not unique-indexed.")
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_applications_job_email ON applications (job_id, email_key)")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @contextmanager
+    def _connection(self) -> Iterator[sqlite3.Connection]:
+        conn = self._pool.get()
+        try:
+            yield conn
+        finally:
+            self._pool.put(conn)
+
+    # --------- Lookups ---------
+    def get(self, application_id: str) -> Optional[dict]:
+        with self._connection() as conn:
+            row = conn.execute(
+                "SELECT data FROM applications WHERE application_id = ?", (application_id.strip(),)
+            ).fetchone()
+        return codec.loads_application(row[0]) if row else None
+
+    def find(self, job_id: str, email: str) -> List[dict]:
+        with self._connection() as conn:
+            rows = conn.execute(
+                "SELECT data FROM applications WHERE job_id = ? AND email_key = ?", application_key(job_id, email)
+            ).fetchall()
+        return [codec.loads_application(row[0]) for row in rows]
+
+    def iter_applications(self) -> Iterator[dict]:
+        with self._connection() as conn:
+            rows = conn.execute("SELECT data FROM applications").fetchall()
+        for row in rows:
+            yield codec.loads_application(row[0])
+
+    def application_ids(self) -> List[str]:
+        with self._connection() as conn:
+            return [row[0] for row in conn.execute("SELECT application_id FROM applications")]
+
+    # --------- Writes ---------
+    def add(self, application: dict) -> str:
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT INTO applications (application_id, job_id, email_key, data, updated_at) VALUES (?, ?, ?, ?, ?)",
+                _row(application),
+            )
+        return f"{self.db_path}#{application['application_id']}"
+
+    def save(self, application: dict):
+        self.save_many([application])
+
+    def create_if_absent(self, application: dict) -> Tuple[dict, Optional[str]]:
+        row = _row(application)
+        with self._connection() as conn:
+            # the write lock makes check + insert one atomic step across processes
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                existing = conn.execute(
+                    "SELECT data FROM applications WHERE job_id = ? AND email_key = ?", (row[1], row[2])
+                ).fetchone()
+                if existing is None:
+                    conn.execute(
+                        "INSERT INTO applications (application_id, job_id, email_key, data, updated_at) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        row,
+                    )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+        if existing is not None:
+            return codec.loads_application(existing[0]), None
+        return application, f"{self.db_path}#{application['application_id']}"
+
+    def save_many(self, applications: Iterable[dict]):
+        """Update applications in one transaction."""
+        with self._connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                for application in applications:
+                    cursor = conn.execute(
+                        "UPDATE applications SET data = ?, updated_at = ? WHERE application_id = ?",
+                        (codec.dumps(application).decode(), time.time(), application["application_id"]),
+                    )
+                    if cursor.rowcount == 0:
+                        raise KeyError(f"Unknown application {application['application_id']}")
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+
+def _row(application: dict) -> Tuple[str, str, str, str, float]:
+    job_id, email = application_key(application["job_id"], application["email"])
+    return application["application_id"], job_id, email, codec.dumps(application).decode(), time.time()
+
+
+def migrate_json_to_sqlite(app_dir: str = APPLICATIONS_DIR, db_path: str = APPLICATIONS_DB) -> int:
+    """Import every application JSON file into the SQLite store. Safe to re-run; returns rows imported."""
+    store = SqliteApplicationStore(db_path)
+    rows = []
+    for path in Path(app_dir).glob("*.json"):
+        with open(path, "rb") as f:
+            rows.append(_row(codec.loads_application(f.read())))
+
+    with store._connection() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        before = conn.total_changes
+        conn.executemany(
+            "INSERT OR IGNORE INTO applications (application_id, job_id, email_key, data, updated_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            rows,
+        )
+        imported = conn.total_changes - before
+        conn.execute("COMMIT")
+    return imported
+
+
+_store: Optional[ApplicationStore] = None
+_store_lock = threading.Lock()
+
+
+def get_application_store() -> ApplicationStore:
+    """
+    Process-wide application store shared by the tools and the updater.
+
+    APPLICATION_STORE selects the backend: "json" (default, files in data/applications)
+    or "sqlite" (APPLICATION_DB_PATH, default data/applications.db).
+    """
+    global _store
+    with _store_lock:
+        if _store is None:
+            if os.getenv("APPLICATION_STORE", "json") == "sqlite":
+                _store = SqliteApplicationStore(os.getenv("APPLICATION_DB_PATH", APPLICATIONS_DB))
+            else:
+                _store = JsonApplicationStore()
+        return _store
+
+
+# One-shot migration of the JSON files into SQLite (run with: python -m src.utils.application_store)
+if __name__ == "__main__":
+    db_path = os.getenv("APPLICATION_DB_PATH", APPLICATIONS_DB)
+    count = migrate_json_to_sqlite(APPLICATIONS_DIR, db_path)
+    print(f"✅ Imported {count} applications from {APPLICATIONS_DIR} into {db_path}")
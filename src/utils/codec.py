@@ -0,0 +1,131 @@
+import json
+import os
+from typing import Any, List, Optional, Union
+
+# JSON backend: msgspec, then orjson, then the standard library. JSON_CODEC forces one.
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_available = [name for name, module in (("msgspec", msgspec), ("orjson", orjson)) if module is not None] + ["json"]
+BACKEND = os.getenv("JSON_CODEC") or _available[0]
+if BACKEND not in _available:
+    raise ValueError(f"❌ JSON_CODEC={BACKEND} is not installed. Available: {', '.join(_available)}.")
+
+
+if msgspec is not None:
+
+    class ApplicationRecord(msgspec.Struct):
+        """Schema of the fields the tools rely on; loads_application warns about records that break it."""
+
+        application_id: str
+        job_id: str
+        email: str
+        job_title: str = ""
+        name: str = ""
+        dob: str = ""
+        skills: List[str] = []
+        experience: str = ""
+        application_status: str = "Pending"
+        resume_reviewed: str = "Not yet"
+        response_timeframe: str = "2 weeks"
+        rejection_reason: str = ""
+        reapply_possible: str = ""
+
+    _encoder = msgspec.json.Encoder()
+    _decoder = msgspec.json.Decoder()
+
+
+def dumps(obj: Any, backend: Optional[str] = None) -> bytes:
+    """Compact JSON as UTF-8 bytes, with `backend` (default BACKEND)."""
+    backend = backend or BACKEND
+    if backend == "msgspec":
+        return _encoder.encode(obj)
+    if backend == "orjson":
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def loads(data: Union[bytes, str], backend: Optional[str] = None) -> Any:
+    backend = backend or BACKEND
+    if backend == "msgspec":
+        return _decoder.decode(data)
+    if backend == "orjson":
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def loads_application(data: Union[bytes, str], backend: Optional[str] = None) -> dict:
+    """
+    Decode an application record to a dict, the same on every backend.
+
+    With msgspec the record is also checked against ApplicationRecord; a record that
+    does not match is still returned as stored, with a warning.
+    """
+    application = loads(data, backend)
+    if (backend or BACKEND) == "msgspec":
+        try:
+            msgspec.convert(application, ApplicationRecord)
+        except msgspec.ValidationError as e:
+            application_id = application.get("application_id") if isinstance(application, dict) else None
+            print(f"⚠️ Application {application_id} does not match the record schema: {e}")
+    return application
+
+
+# catch these to handle malformed input from any backend
+DECODE_ERRORS = tuple(
+    [json.JSONDecodeError]
+    + ([msgspec.DecodeError] if msgspec is not None else [])
+    + ([orjson.JSONDecodeError] if orjson is not None else [])
+)
+
+
+# --------- Micro-benchmark ---------
+def _benchmark(rounds: int = 20000, backends: Optional[List[str]] = None):
+    import time
+    import uuid
+
+    record = {
+        "application_id": str(uuid.uuid4()),
+        "job_id": "J001",
+        "job_title": "Software Engineer",
+        "name": "Jane Doe",
+        "dob": "01-02-1990",
+        "email": "jane@example.com",
+        "skills": ["python", "sql", "aws"],
+        "experience": "5 years",
+        "application_status": "Pending",
+        "resume_reviewed": "Not yet",
+        "response_timeframe": "2 weeks",
+        "rejection_reason": "",
+        "reapply_possible": "",
+    }
+    encoded = dumps(record)
+
+    results = []
+    for backend in backends or _available:
+        started = time.perf_counter()
+        for _ in range(rounds):
+            dumps(record, backend)
+        encode_us = (time.perf_counter() - started) * 1e6 / rounds
+
+        started = time.perf_counter()
+        for _ in range(rounds):
+            loads_application(encoded, backend)
+        decode_us = (time.perf_counter() - started) * 1e6 / rounds
+        results.append((backend, encode_us, decode_us))
+
+    print(f"{'backend':<8} {'encode us':>10} {'decode us':>10}  (application record, {len(encoded)} bytes)")
+    for name, encode_us, decode_us in results:
+        print(f"{name:<8} {encode_us:>10.2f} {decode_us:>10.2f}")
+
+
+# Encode/decode cost per application record (run with: python -m src.utils.codec)
+if __name__ == "__main__":
+    _benchmark()
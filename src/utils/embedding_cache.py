@@ -0,0 +1,113 @@
+import hashlib
+import sqlite3
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+
+def normalize_query(text: str) -> str:
+    """Lowercase, collapse whitespace and drop trailing punctuation so trivially different phrasings share a key."""
+    return " ".join(text.lower().split()).rstrip("?.! ")
+
+
+class EmbeddingCache:
+    """
+    Bounded LRU cache of query embeddings keyed on (embed model, normalized query).
+
+    Entries optionally expire after `ttl` seconds. If `disk_path` is given, entries are
+    also written to a small SQLite file so the cache survives worker restarts and is
+    shared between worker processes on the same host.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl: Optional[float] = None,
+        disk_path: Optional[str] = None,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+        self._entries: "OrderedDict[str, Tuple[float, List[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self._db = None
+        if disk_path:
+            Path(disk_path).parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(disk_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, created REAL, vector BLOB)"
+            )
+            if ttl is not None:
+                self._db.execute("DELETE FROM embeddings WHERE created < ?", (time.time() - ttl,))
+            self._db.commit()
+
+    @staticmethod
+    def make_key(text: str, model: str) -> str:
+        return hashlib.sha256(f"{model}\0{normalize_query(text)}".encode("utf-8")).hexdigest()
+
+    def get(self, text: str, model: str) -> Optional[List[float]]:
+        key = self.make_key(text, model)
+        now = time.time()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None and self._db is not None:
+                row = self._db.execute(
+                    "SELECT created, vector FROM embeddings WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    entry = (row[0], array("f", row[1]).tolist())
+                    self._store(key, entry)
+
+            if entry is not None and self.ttl is not None and now - entry[0] > self.ttl:
+                self._entries.pop(key, None)
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, text: str, model: str, embedding: List[float]):
+        key = self.make_key(text, model)
+        entry = (time.time(), list(embedding))
+
+        with self._lock:
+            self._store(key, entry)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO embeddings (key, created, vector) VALUES (?, ?, ?)",
+                    (key, entry[0], array("f", entry[1]).tobytes()),
+                )
+                self._db.commit()
+
+    def _store(self, key: str, entry: Tuple[float, List[float]]):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM embeddings")
+                self._db.commit()
+
+    def stats(self) -> Dict[str, float]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "size": len(self._entries),
+        }
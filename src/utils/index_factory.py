@@ -0,0 +1,205 @@
+import math
+import os
+import time
+from typing import Dict, List, Optional
+
+import faiss
+import numpy as np
+
+INDEX_TYPES = ("flat", "ivf_flat", "hnsw", "ivf_pq", "opq_ivf_pq")
+
+# cosine is inner product over L2-normalized vectors, so search is a plain dot product
+METRICS = {"l2": faiss.METRIC_L2, "cosine": faiss.METRIC_INNER_PRODUCT}
+
+# memory-map flat code storage (older FAISS builds only know the IVF-level flag)
+_MMAP_FLAGS = getattr(faiss, "IO_FLAG_MMAP_IFC", faiss.IO_FLAG_MMAP) | faiss.IO_FLAG_READ_ONLY
+
+
+def make_faiss_index(
+    vectors: np.ndarray,
+    index_type: str = "flat",
+    metric: int = faiss.METRIC_L2,
+    nlist: Optional[int] = None,
+    hnsw_m: int = 32,
+    pq_m: Optional[int] = None,
+    nbits: int = 8,
+) -> faiss.Index:
+    """
+    Create an empty FAISS index of `index_type`, trained on `vectors` if the type needs it.
+
+    - flat: exact brute-force search
+    - ivf_flat: inverted lists over `nlist` k-means cells, exact vectors inside each cell
+    - hnsw: graph index with `hnsw_m` neighbours per node, no training
+    - ivf_pq / opq_ivf_pq: inverted lists with product-quantized vectors (`pq_m` bytes
+      per vector at 8 bits), optionally rotated by OPQ first
+
+    The vectors are only used for training; add them to the index afterwards.
+    """
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"❌ Unknown index type '{index_type}'. Choose one of {', '.join(INDEX_TYPES)}.")
+
+    n, dim = vectors.shape
+    # ~4*sqrt(N) cells, but keep the ~39 training points per cell k-means needs
+    nlist = nlist or max(1, min(int(4 * math.sqrt(n)), n // 39))
+    pq_m = pq_m or _default_pq_m(dim)
+
+    if index_type == "flat":
+        spec = "Flat"
+    elif index_type == "ivf_flat":
+        spec = f"IVF{nlist},Flat"
+    elif index_type == "hnsw":
+        spec = f"HNSW{hnsw_m}"
+    elif index_type == "ivf_pq":
+        spec = f"IVF{nlist},PQ{pq_m}x{nbits}"
+    else:
+        spec = f"OPQ{pq_m},IVF{nlist},PQ{pq_m}x{nbits}"
+
+    if index_type in ("ivf_pq", "opq_ivf_pq") and n < 2**nbits:
+        raise ValueError(
+            f"❌ {index_type} needs at least {2 ** nbits} chunks to train ({n} given). Use a smaller nbits or ivf_flat."
+        )
+
+    index = faiss.index_factory(dim, spec, metric)
+    if not index.is_trained:
+        index.train(np.ascontiguousarray(vectors, dtype="float32"))
+    return index
+
+
+def set_search_params(index: faiss.Index, nprobe: Optional[int] = None, ef_search: Optional[int] = None):
+    """Apply query-time knobs; parameters that do not apply to the index type are ignored."""
+    params = faiss.ParameterSpace()
+    if nprobe is not None and faiss.try_extract_index_ivf(index) is not None:
+        params.set_index_parameter(index, "nprobe", nprobe)
+    if ef_search is not None and _find_hnsw(index) is not None:
+        params.set_index_parameter(index, "efSearch", ef_search)
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """Return `vectors` as contiguous float32 rows scaled to unit length."""
+    vectors = np.array(vectors, dtype="float32", ndmin=2)
+    faiss.normalize_L2(vectors)
+    return vectors
+
+
+def read_faiss_index(path: str, mmap: bool = False) -> faiss.Index:
+    """
+    Read a persisted index, memory-mapping its vectors if `mmap` is set.
+
+    A mapped index is read-only and its pages live in the shared page cache, so worker
+    processes on one host share a single copy and loading does not scale with index
+    size. Parts FAISS cannot map (graphs, IVF lists) are read into memory as usual,
+    and if the index cannot be opened mapped at all it is read normally.
+    """
+    if mmap:
+        try:
+            return faiss.read_index(path, _MMAP_FLAGS)
+        except RuntimeError as e:
+            print(f"⚠️ Could not memory-map {path}, loading it into memory instead: {e}")
+    return faiss.read_index(path)
+
+
+def write_faiss_index(index: faiss.Index, path: str):
+    """Write via a temp file and rename, so processes that have the old file mapped keep a valid view."""
+    tmp_path = f"{path}.tmp"
+    faiss.write_index(index, tmp_path)
+    os.replace(tmp_path, path)
+
+
+def is_flat(index: faiss.Index) -> bool:
+    return isinstance(faiss.downcast_index(index), faiss.IndexFlat)
+
+
+def _find_hnsw(index: faiss.Index):
+    index = faiss.downcast_index(index)
+    return index if isinstance(index, faiss.IndexHNSW) else None
+
+
+def _default_pq_m(dim: int) -> int:
+    # largest divisor of dim giving at most 16 dims per sub-quantizer (96 bytes for 1536-d)
+    for m in range(max(1, dim // 16), dim + 1):
+        if dim % m == 0:
+            return m
+    return dim
+
+
+# --------- Recall vs Latency ---------
+def recall_report(
+    vectors: np.ndarray,
+    queries: np.ndarray,
+    configs: List[Dict],
+    k: int = 5,
+    metric: int = faiss.METRIC_L2,
+) -> List[Dict]:
+    """
+    Measure recall@k and per-query latency of each config against exact search.
+
+    Each config is a dict of `make_faiss_index` arguments plus optional `nprobe` /
+    `ef_search` lists to sweep, e.g. {"index_type": "ivf_flat", "nprobe": [1, 8, 32]}.
+    """
+    vectors = np.ascontiguousarray(vectors, dtype="float32")
+    queries = np.ascontiguousarray(queries, dtype="float32")
+
+    exact = faiss.IndexFlat(vectors.shape[1], metric)
+    exact.add(vectors)
+    _, truth = exact.search(queries, k)
+
+    rows = []
+    for config in configs:
+        config = dict(config)
+        nprobes = config.pop("nprobe", [None])
+        ef_searches = config.pop("ef_search", [None])
+
+        started = time.perf_counter()
+        index = make_faiss_index(vectors, metric=metric, **config)
+        index.add(vectors)
+        build_seconds = time.perf_counter() - started
+
+        for nprobe in nprobes:
+            for ef_search in ef_searches:
+                set_search_params(index, nprobe=nprobe, ef_search=ef_search)
+                started = time.perf_counter()
+                _, found = index.search(queries, k)
+                latency_ms = (time.perf_counter() - started) * 1000 / len(queries)
+
+                hits = sum(len(set(f) & set(t)) for f, t in zip(found, truth))
+                rows.append(
+                    {
+                        **config,
+                        "nprobe": nprobe,
+                        "ef_search": ef_search,
+                        "recall": hits / truth.size,
+                        "latency_ms": latency_ms,
+                        "build_s": build_seconds,
+                        "bytes": faiss.serialize_index(index).nbytes,
+                    }
+                )
+    return rows
+
+
+# Recall vs latency for the persisted index (run with: python -m src.utils.index_factory)
+if __name__ == "__main__":
+    index = faiss.read_index("data/faiss.index")
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        # IVF indexes need a direct map to reconstruct (lossy for PQ, so compare against a flat build)
+        ivf.make_direct_map()
+    vectors = index.reconstruct_n(0, index.ntotal)
+    rng = np.random.default_rng(0)
+    sample = vectors[rng.choice(len(vectors), size=min(200, len(vectors)), replace=False)]
+    queries = sample + rng.normal(scale=0.01, size=sample.shape).astype("float32")
+
+    configs = [
+        {"index_type": "flat"},
+        {"index_type": "ivf_flat", "nprobe": [1, 4, 16, 64]},
+        {"index_type": "hnsw", "ef_search": [16, 64, 256]},
+    ]
+    if len(vectors) >= 256:
+        configs.append({"index_type": "ivf_pq", "nprobe": [4, 16, 64]})
+        configs.append({"index_type": "opq_ivf_pq", "nprobe": [4, 16, 64]})
+
+    print(f"{'index':<12} {'nprobe':>6} {'efSearch':>8} {'recall@5':>9} {'ms/query':>9} {'MB':>8}")
+    for row in recall_report(vectors, queries, configs, k=5, metric=index.metric_type):
+        print(
+            f"{row['index_type']:<12} {str(row['nprobe'] or '-'):>6} {str(row['ef_search'] or '-'):>8} "
+            f"{row['recall']:>9.3f} {row['latency_ms']:>9.3f} {row['bytes'] / 1e6:>8.1f}"
+        )
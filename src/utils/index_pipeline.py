@@ -0,0 +1,161 @@
+import asyncio
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from llama_index.core import Settings
+from llama_index.core.base.embeddings.base import BaseEmbedding
+from llama_index.core.node_parser import NodeParser
+from llama_index.core.schema import BaseNode, Document, MetadataMode
+from llama_index.core.utils import get_tokenizer
+from llama_index.readers.file import PDFReader
+
+
+def _parse_pdf(pdf_file: str) -> List[Document]:
+    # runs in a worker process, so it must stay a module-level function
+    return PDFReader().load_data(file=Path(pdf_file))
+
+
+@dataclass
+class StageStats:
+    name: str
+    unit: str
+    count: int = 0
+    seconds: float = 0.0
+
+    @property
+    def rate(self) -> float:
+        return self.count / self.seconds if self.seconds else 0.0
+
+    def __str__(self) -> str:
+        return f"{self.name}: {self.count} {self.unit} in {self.seconds:.2f}s ({self.rate:.1f} {self.unit}/s)"
+
+
+@dataclass
+class PipelineStats:
+    parse: StageStats = field(default_factory=lambda: StageStats("parse", "pages"))
+    chunk: StageStats = field(default_factory=lambda: StageStats("chunk", "chunks"))
+    embed: StageStats = field(default_factory=lambda: StageStats("embed", "tokens"))
+    embed_retries: int = 0
+    total_seconds: float = 0.0
+
+    def report(self) -> str:
+        return "\n".join(
+            [
+                f"  {self.parse}",
+                f"  {self.chunk}",
+                f"  {self.embed} [{self.embed_retries} retries]",
+                f"  total: {self.total_seconds:.2f}s",
+            ]
+        )
+
+
+class IndexBuildPipeline:
+    """
+    Turns PDF files into embedded nodes ready to add to a vector index.
+
+    Three stages run concurrently: PDFs are parsed in a process pool, each file's
+    pages are chunked as soon as it is parsed, and chunks are embedded in batches of
+    `batch_size` with at most `max_concurrency` requests in flight. Failed embedding
+    batches are retried with exponential backoff.
+    """
+
+    def __init__(
+        self,
+        embed_model: BaseEmbedding,
+        node_parser: Optional[NodeParser] = None,
+        parse_workers: Optional[int] = None,
+        batch_size: int = 64,
+        max_concurrency: int = 4,
+        max_retries: int = 5,
+        backoff: float = 1.0,
+    ):
+        self.embed_model = embed_model
+        # same chunking as VectorStoreIndex.from_documents uses by default
+        self.node_parser = node_parser or Settings.node_parser
+        self.parse_workers = parse_workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff = backoff
+
+        self.stats = PipelineStats()
+
+    def run(self, pdf_files: List[Path]) -> Tuple[Dict[str, List[Document]], List[BaseNode]]:
+        """Blocking `arun` for scripts; it starts its own event loop, so async callers await `arun`."""
+        return asyncio.run(self.arun(pdf_files))
+
+    async def arun(self, pdf_files: List[Path]) -> Tuple[Dict[str, List[Document]], List[BaseNode]]:
+        """Parse, chunk and embed `pdf_files`. Returns the parsed documents per file name and the embedded nodes."""
+        self.stats = PipelineStats()
+        started = time.perf_counter()
+
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        count_tokens = get_tokenizer()
+
+        docs_by_file: Dict[str, List[Document]] = {}
+        nodes: List[BaseNode] = []
+        pending: List[BaseNode] = []
+        embed_tasks: List[asyncio.Task] = []
+        embed_started: Optional[float] = None
+
+        def dispatch(batch: List[BaseNode]):
+            nonlocal embed_started
+            if embed_started is None:
+                embed_started = time.perf_counter()
+            embed_tasks.append(asyncio.create_task(self._embed_batch(batch, semaphore, count_tokens)))
+
+        with ProcessPoolExecutor(max_workers=max(1, min(self.parse_workers, len(pdf_files)))) as pool:
+
+            async def parse(pdf_file: Path) -> Tuple[Path, List[Document]]:
+                return pdf_file, await loop.run_in_executor(pool, _parse_pdf, str(pdf_file))
+
+            for future in asyncio.as_completed([parse(pdf_file) for pdf_file in pdf_files]):
+                pdf_file, docs = await future
+                docs_by_file[pdf_file.name] = docs
+                self.stats.parse.count += len(docs)
+                self.stats.parse.seconds = time.perf_counter() - started
+
+                # chunk this file while the others are still being parsed
+                chunk_started = time.perf_counter()
+                file_nodes = self.node_parser.get_nodes_from_documents(docs)
+                self.stats.chunk.count += len(file_nodes)
+                self.stats.chunk.seconds += time.perf_counter() - chunk_started
+
+                nodes.extend(file_nodes)
+                pending.extend(file_nodes)
+                while len(pending) >= self.batch_size:
+                    dispatch(pending[: self.batch_size])
+                    pending = pending[self.batch_size :]
+
+        if pending:
+            dispatch(pending)
+        await asyncio.gather(*embed_tasks)
+
+        if embed_started is not None:
+            self.stats.embed.seconds = time.perf_counter() - embed_started
+        self.stats.total_seconds = time.perf_counter() - started
+        return docs_by_file, nodes
+
+    async def _embed_batch(self, batch: List[BaseNode], semaphore: asyncio.Semaphore, count_tokens):
+        texts = [node.get_content(metadata_mode=MetadataMode.EMBED) for node in batch]
+
+        async with semaphore:
+            for attempt in range(self.max_retries + 1):
+                try:
+                    embeddings = await self.embed_model.aget_text_embedding_batch(texts)
+                    break
+                except Exception:
+                    if attempt == self.max_retries:
+                        raise
+                    self.stats.embed_retries += 1
+                    await asyncio.sleep(self.backoff * (2**attempt) * (0.5 + random.random()))
+
+        for node, embedding in zip(batch, embeddings):
+            node.embedding = embedding
+        self.stats.embed.count += sum(len(count_tokens(text)) for text in texts)
@@ -1,115 +1,559 @@
+import asyncio
+import bisect
+import hashlib
+import json
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List
+from typing import Dict, List, NamedTuple, Optional, Tuple
 
 import faiss
+import numpy as np
 from llama_index.core import (
     VectorStoreIndex,
     StorageContext,
     load_index_from_storage,
 )
-from llama_index.readers.file import PDFReader
+from llama_index.core.schema import BaseNode, NodeWithScore
 from llama_index.embeddings.openai import OpenAIEmbedding
 from llama_index.vector_stores.faiss import FaissVectorStore
 from dotenv import load_dotenv
+from src.utils.answer_cache import SemanticAnswerCache
+from src.utils.embedding_cache import EmbeddingCache
+from src.utils.index_factory import (
+    METRICS,
+    is_flat,
+    make_faiss_index,
+    normalize_rows,
+    read_faiss_index,
+    set_search_params,
+    write_faiss_index,
+)
+from src.utils.index_pipeline import IndexBuildPipeline
 load_dotenv()
 
+# Bounded pool for blocking index work (loading, FAISS search) so async callers never run it on the event loop
+_search_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("RETRIEVER_SEARCH_THREADS", "4")),
+    thread_name_prefix="retriever-search",
+)
+
+
+class _IndexState(NamedTuple):
+    """A loaded index with its vector store and generation, swapped and read as one unit."""
+
+    index: VectorStoreIndex
+    vector_store: FaissVectorStore
+    generation: Optional[str]
+
+
 class Retriever:
     def __init__(
         self,
         storage_dir: str = "data/storage",
         faiss_index_path: str = "data/faiss.index",
         embed_model: str = "text-embedding-3-small",
+        embedding_cache: Optional[EmbeddingCache] = None,
+        answer_cache: Optional[SemanticAnswerCache] = None,
+        index_type: str = "flat",
+        index_params: Optional[dict] = None,
+        nprobe: Optional[int] = None,
+        ef_search: Optional[int] = None,
+        mmap: bool = False,
+        metric: Optional[str] = None,
     ):
         self.storage_dir = Path(storage_dir)
         self.faiss_index_path = Path(faiss_index_path)
         self.embed_model_name = embed_model
 
-        self.index = None
-        self.vector_store = None
+        # index_type/index_params only apply to builds; nprobe/ef_search tune queries on IVF/HNSW indexes
+        self.index_type = index_type
+        self.index_params = index_params or {}
+        self.nprobe = nprobe
+        self.ef_search = ef_search
+        # memory-map the FAISS file for queries (read-only, shared between worker processes)
+        self.mmap = mmap
+        # "l2" or "cosine"; None builds with l2 and otherwise follows whatever the persisted index uses
+        if metric is not None and metric not in METRICS:
+            raise ValueError(f"❌ Unknown metric '{metric}'. Choose one of {', '.join(METRICS)}.")
+        self.metric = metric
+
+        # replaced in one assignment, so a query never pairs an index with another load's vector store
+        self._state: Optional[_IndexState] = None
+        self._embed_model = None
+        self.embedding_cache = embedding_cache
+        self.answer_cache = answer_cache
+        self._load_lock = threading.Lock()
 
         # ensure dirs exist
         self.storage_dir.mkdir(parents=True, exist_ok=True)
         self.faiss_index_path.parent.mkdir(parents=True, exist_ok=True)
 
+    @property
+    def index(self) -> Optional[VectorStoreIndex]:
+        state = self._state
+        return state.index if state is not None else None
+
+    @property
+    def vector_store(self) -> Optional[FaissVectorStore]:
+        state = self._state
+        return state.vector_store if state is not None else None
+
+    @property
+    def generation(self) -> Optional[str]:
+        """Generation of the on-disk index that `index` was loaded from."""
+        state = self._state
+        return state.generation if state is not None else None
+
     # --------- Build Index from PDFs ---------
-    def build_index(self, pdf_dir: str):
+    def build_index(self, pdf_dir: str, incremental: bool = False, pipeline: Optional[IndexBuildPipeline] = None):
+        """
+        Build the index from every PDF in `pdf_dir`, for scripts and the CLI.
+
+        Starts its own event loop, so async callers (agent tools, notebooks) must await
+        `abuild_index` instead.
+        """
+        return asyncio.run(self.abuild_index(pdf_dir, incremental=incremental, pipeline=pipeline))
+
+    async def abuild_index(
+        self, pdf_dir: str, incremental: bool = False, pipeline: Optional[IndexBuildPipeline] = None
+    ):
+        """
+        Build the index from every PDF in `pdf_dir`.
+
+        With `incremental=True` the existing index is updated in place instead: only new or
+        changed files (by content hash, tracked in the manifest) are embedded, and the
+        vectors of removed files are deleted. Falls back to a full build if there is no
+        index or manifest yet.
+
+        Parsing, chunking and embedding go through `pipeline` (a default
+        IndexBuildPipeline if not given), which prints per-stage throughput. The blocking
+        steps (hashing, FAISS, persisting) run in a thread, off the event loop.
+        """
         pdf_dir = Path(pdf_dir)
         if not pdf_dir.exists():
             raise FileNotFoundError(f"❌ PDF directory not found: {pdf_dir}")
 
-        docs = []
-        for pdf_file in pdf_dir.glob("*.pdf"):
-            reader = PDFReader()
-            pdf_docs = reader.load_data(file=pdf_file)
-            docs.extend(pdf_docs)
+        pipeline = pipeline or IndexBuildPipeline(self.get_embed_model())
 
-        if not docs:
+        if incremental and self.manifest_path.exists() and self.faiss_index_path.exists():
+            meta = self._read_meta()
+            if self.metric is None and meta is not None:
+                # keep the metric the index was built with
+                self.metric = meta.get("metric", "l2")
+            if meta == self._index_meta():
+                return await self._aupdate_index(pdf_dir, pipeline)
+            print("⚠️ Index settings changed since the last build, rebuilding from scratch.")
+
+        docs_by_file, nodes = await pipeline.arun(list(pdf_dir.glob("*.pdf")))
+        if not nodes:
             raise ValueError("❌ No PDFs found to index.")
 
-        # embedding model
-        embed_model = OpenAIEmbedding(model=self.embed_model_name,api_key=os.getenv("OPENAI_API_KEY"))
+        await asyncio.to_thread(self._build_from_nodes, pdf_dir, docs_by_file, nodes)
+        print(f"✅ Index built with {sum(map(len, docs_by_file.values()))} documents from {pdf_dir}")
+        print(pipeline.stats.report())
 
-        # figure out embedding dim
-        if self.embed_model_name == "text-embedding-3-small":
-            embed_dim = 1536
-        elif self.embed_model_name == "text-embedding-3-large":
-            embed_dim = 3072
-        else:
-            dummy_vec = embed_model.get_text_embedding("hello world")
-            embed_dim = len(dummy_vec)
+    def _build_from_nodes(self, pdf_dir: Path, docs_by_file: Dict[str, list], nodes: List[BaseNode]):
+        manifest = {
+            name: {
+                "sha256": _file_sha256(pdf_dir / name),
+                "ref_doc_ids": [doc.doc_id for doc in docs],
+            }
+            for name, docs in docs_by_file.items()
+        }
 
-        # setup FAISS
-        faiss_index = faiss.IndexFlatL2(embed_dim)
-        self.vector_store = FaissVectorStore(faiss_index=faiss_index)
+        # setup FAISS, sized and trained (for IVF/PQ types) on the embeddings the pipeline produced
+        self.metric = self.metric or "l2"
+        vectors = _prepare_vectors(nodes, self.metric)
+        faiss_index = make_faiss_index(vectors, self.index_type, metric=METRICS[self.metric], **self.index_params)
+        set_search_params(faiss_index, nprobe=self.nprobe, ef_search=self.ef_search)
+        vector_store = FaissVectorStore(faiss_index=faiss_index)
 
-        storage_context = StorageContext.from_defaults(vector_store=self.vector_store)
+        storage_context = StorageContext.from_defaults(vector_store=vector_store)
 
-        # LlamaIndex handles chunking automatically here
-        self.index = VectorStoreIndex.from_documents(
-            docs,
+        # nodes are already chunked and embedded, so this only fills FAISS and the docstore
+        index = VectorStoreIndex(
+            nodes,
             storage_context=storage_context,
-            embed_model=embed_model,
+            embed_model=self.get_embed_model(),
+        )
+
+        self._persist(index, vector_store, manifest)
+
+    async def _aupdate_index(self, pdf_dir: Path, pipeline: IndexBuildPipeline):
+        manifest = json.loads(self.manifest_path.read_text())
+        current = {pdf_file.name: pdf_file for pdf_file in pdf_dir.glob("*.pdf")}
+        hashes = await asyncio.to_thread(lambda: {name: _file_sha256(path) for name, path in current.items()})
+
+        stale = [
+            name for name, entry in manifest.items()
+            if name not in current or entry["sha256"] != hashes[name]
+        ]
+        fresh = [
+            name for name in current
+            if name not in manifest or manifest[name]["sha256"] != hashes[name]
+        ]
+        if not stale and not fresh:
+            print(f"✅ Index already up to date with {pdf_dir}")
+            return
+
+        # work on a private, writable copy so queries on the live index are never affected mid-update
+        vector_store, index = await asyncio.to_thread(self._read_index, mmap=False)
+
+        if stale and not is_flat(vector_store.client):
+            # only flat indexes can drop vectors while keeping positions aligned with the docstore
+            print(f"⚠️ Removing documents from a {self.index_type} index needs a full rebuild.")
+            return await self.abuild_index(str(pdf_dir), pipeline=pipeline)
+
+        docs_by_file, nodes = await pipeline.arun([current[name] for name in fresh]) if fresh else ({}, [])
+
+        def apply():
+            stale_ref_doc_ids = [ref for name in stale for ref in manifest.pop(name)["ref_doc_ids"]]
+            if stale_ref_doc_ids:
+                _delete_ref_docs(index, vector_store.client, stale_ref_doc_ids)
+            if nodes:
+                _prepare_vectors(nodes, self.metric)
+                index.insert_nodes(nodes)
+            for name, docs in docs_by_file.items():
+                manifest[name] = {
+                    "sha256": hashes[name],
+                    "ref_doc_ids": [doc.doc_id for doc in docs],
+                }
+            self._persist(index, vector_store, manifest)
+
+        await asyncio.to_thread(apply)
+        print(
+            f"✅ Index updated from {pdf_dir}: {len(fresh)} file(s) embedded "
+            f"({sum(map(len, docs_by_file.values()))} documents), {len(stale)} file(s) replaced or removed"
         )
+        if fresh:
+            print(pipeline.stats.report())
 
-        # persist
-        self.index.storage_context.persist(persist_dir=str(self.storage_dir))
-        faiss.write_index(faiss_index, str(self.faiss_index_path))
+    def _persist(self, index: VectorStoreIndex, vector_store: FaissVectorStore, manifest: Dict[str, dict]):
+        index.storage_context.persist(persist_dir=str(self.storage_dir))
+        write_faiss_index(vector_store.client, str(self.faiss_index_path))
+        self.manifest_path.write_text(json.dumps(manifest, indent=2))
+        self.meta_path.write_text(json.dumps(self._index_meta(), indent=2))
 
-        print(f"✅ Index built with {len(docs)} documents from {pdf_dir}")
+        # bump the generation last, so readers only swap once everything is on disk
+        generation = str(time.time_ns())
+        self.generation_path.write_text(generation)
+        self._state = _IndexState(index, vector_store, generation)
+        if self.answer_cache is not None:
+            self.answer_cache.invalidate()
 
     # --------- Load Existing Index ---------
     def load_index(self):
         if not self.storage_dir.exists() or not self.faiss_index_path.exists():
             raise FileNotFoundError("❌ No index found. Run build_index first.")
 
-        faiss_index = faiss.read_index(str(self.faiss_index_path))
-        self.vector_store = FaissVectorStore(faiss_index=faiss_index)
+        # read the generation before the files, so a concurrent rebuild is picked up next check
+        generation = self.current_generation()
+
+        vector_store, index = self._read_index(mmap=self.mmap)
+
+        # swap in one go; queries already running keep the state they started with
+        self._state = _IndexState(index, vector_store, generation)
+
+    def _read_index(self, mmap: bool) -> Tuple[FaissVectorStore, VectorStoreIndex]:
+        faiss_index = read_faiss_index(str(self.faiss_index_path), mmap=mmap)
+
+        # the metric decides whether queries get normalized, so it must match what was built
+        metric = (self._read_meta() or {}).get("metric", "l2")
+        if self.metric is not None and self.metric != metric:
+            raise ValueError(f"❌ Index in {self.storage_dir} was built with the '{metric}' metric, not '{self.metric}'.")
+        if faiss_index.metric_type != METRICS[metric]:
+            raise ValueError(f"❌ {self.faiss_index_path} does not use the '{metric}' metric recorded in {self.meta_path}.")
+
+        set_search_params(faiss_index, nprobe=self.nprobe, ef_search=self.ef_search)
+        vector_store = FaissVectorStore(faiss_index=faiss_index)
 
         storage_context = StorageContext.from_defaults(
             persist_dir=str(self.storage_dir),
-            vector_store=self.vector_store,
+            vector_store=vector_store,
         )
 
-        self.index = load_index_from_storage(storage_context)
+        index = load_index_from_storage(storage_context, embed_model=self.get_embed_model())
+        return vector_store, index
+
+    @property
+    def manifest_path(self) -> Path:
+        return self.storage_dir / "manifest.json"
+
+    @property
+    def meta_path(self) -> Path:
+        return self.storage_dir / "index_meta.json"
+
+    def _index_meta(self) -> dict:
+        return {
+            "embed_model": self.embed_model_name,
+            "index_type": self.index_type,
+            "index_params": self.index_params,
+            "metric": self.metric or "l2",
+        }
+
+    def _read_meta(self) -> Optional[dict]:
+        try:
+            return json.loads(self.meta_path.read_text())
+        except FileNotFoundError:
+            return None
+
+    @property
+    def generation_path(self) -> Path:
+        return self.storage_dir / "generation"
+
+    def current_generation(self) -> Optional[str]:
+        """Generation of the index on disk, falling back to the FAISS file mtime for older builds."""
+        try:
+            return self.generation_path.read_text().strip()
+        except FileNotFoundError:
+            pass
+        try:
+            return str(self.faiss_index_path.stat().st_mtime_ns)
+        except FileNotFoundError:
+            return None
+
+    def ensure_fresh(self):
+        """Load the index if needed, or hot-swap it when a newer generation is on disk."""
+        state = self._state
+        if state is not None and self.current_generation() == state.generation:
+            return
+
+        with self._load_lock:
+            # another session may have reloaded while we waited for the lock
+            state = self._state
+            if state is None or self.current_generation() != state.generation:
+                self.load_index()
+
+    def get_embed_model(self) -> OpenAIEmbedding:
+        if self._embed_model is None:
+            self._embed_model = OpenAIEmbedding(model=self.embed_model_name, api_key=os.getenv("OPENAI_API_KEY"))
+        return self._embed_model
 
     # --------- Query ---------
     def query(self, query: str, top_k: int = 3) -> str:
-        if self.index is None:
-            self.load_index()
+        self.ensure_fresh()
+
+        embedding = self._embed_query(query)
+        return self._context(query, embedding, top_k)
+
+    async def aquery(self, query: str, top_k: int = 3, timeout: Optional[float] = None) -> str:
+        """
+        Non-blocking variant of `query` for use on the event loop.
+
+        Index loading and the FAISS search run on a bounded thread pool, the embedding
+        uses the async OpenAI client. Raises asyncio.TimeoutError if the whole lookup
+        takes longer than `timeout` seconds.
+        """
+        return await asyncio.wait_for(self._aquery(query, top_k), timeout)
+
+    async def _aquery(self, query: str, top_k: int) -> str:
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(_search_executor, self.ensure_fresh)
+
+        embedding = await self._aembed_query(query)
+        return await loop.run_in_executor(_search_executor, self._context, query, embedding, top_k)
 
-        retriever = self.index.as_retriever(similarity_top_k=top_k)
-        results = retriever.retrieve(query)
+    def _embed_query(self, query: str) -> List[float]:
+        if self.embedding_cache is not None:
+            embedding = self.embedding_cache.get(query, self.embed_model_name)
+            if embedding is not None:
+                return embedding
+
+        embedding = self.get_embed_model().get_query_embedding(query)
+        if self.embedding_cache is not None:
+            self.embedding_cache.put(query, self.embed_model_name, embedding)
+        return embedding
+
+    async def _aembed_query(self, query: str) -> List[float]:
+        # the cache may hit its SQLite tier, so lookups and stores run on the search pool too
+        loop = asyncio.get_running_loop()
+        if self.embedding_cache is not None:
+            embedding = await loop.run_in_executor(
+                _search_executor, self.embedding_cache.get, query, self.embed_model_name
+            )
+            if embedding is not None:
+                return embedding
+
+        embedding = await self.get_embed_model().aget_query_embedding(query)
+        if self.embedding_cache is not None:
+            await loop.run_in_executor(
+                _search_executor, self.embedding_cache.put, query, self.embed_model_name, embedding
+            )
+        return embedding
+
+    def _context(self, query: str, embedding: List[float], top_k: int) -> str:
+        state = self._state
+        if self.answer_cache is not None:
+            context = self.answer_cache.lookup(embedding, top_k, state.generation)
+            if context is not None:
+                print(f"Answer cache hit for query: {query}")
+                return context
+
+        results = self._search_many(state, [embedding], top_k)[0]
         print(f"Retrieved {len(results)} results for query: {query}")
 
-        return "\n".join(f"CONTEXT: {r.text}" for r in results)
+        context = "\n".join(f"CONTEXT: {r.text}" for r in results)
+        if self.answer_cache is not None:
+            self.answer_cache.store(embedding, top_k, context, state.generation)
+        return context
+
+    def query_many(self, queries: List[str], top_k: int = 3) -> List[List[NodeWithScore]]:
+        """
+        Run many queries at once, e.g. for offline evaluation or cache warm-up.
+
+        Uncached queries are embedded in batched requests and all of them go through a
+        single multi-row FAISS search. Returns the ranked results with scores for each
+        query, in input order (scores are FAISS distances for l2, similarities for cosine).
+        """
+        if not queries:
+            return []
+        self.ensure_fresh()
+
+        embeddings = self._embed_queries(queries)
+        results = self._search_many(self._state, embeddings, top_k)
+        print(f"Retrieved results for {len(queries)} queries")
+        return results
+
+    def _embed_queries(self, queries: List[str]) -> List[List[float]]:
+        embeddings: List[Optional[List[float]]] = [None] * len(queries)
+        if self.embedding_cache is not None:
+            embeddings = [self.embedding_cache.get(query, self.embed_model_name) for query in queries]
+
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if missing:
+            # the embed model splits this into requests of embed_batch_size texts
+            new_embeddings = self.get_embed_model().get_text_embedding_batch([queries[i] for i in missing])
+            for i, embedding in zip(missing, new_embeddings):
+                embeddings[i] = embedding
+                if self.embedding_cache is not None:
+                    self.embedding_cache.put(queries[i], self.embed_model_name, embedding)
+        return embeddings
+
+    def _search_many(self, state: _IndexState, embeddings: List[List[float]], top_k: int) -> List[List[NodeWithScore]]:
+        index, faiss_index = state.index, state.vector_store.client
+
+        matrix = np.asarray(embeddings, dtype="float32")
+        if faiss_index.metric_type == faiss.METRIC_INNER_PRODUCT:
+            # cosine index: unit query vectors, so FAISS scores are a plain dot product
+            matrix = normalize_rows(matrix)
+        scores, positions = faiss_index.search(matrix, top_k)
+
+        # FAISS positions -> docstore nodes, fetched once for all queries
+        nodes_dict = index.index_struct.nodes_dict
+        node_ids = {nodes_dict[str(pos)] for pos in positions.flat if pos >= 0}
+        nodes = {node.node_id: node for node in index.docstore.get_nodes(list(node_ids))}
+
+        return [
+            [
+                NodeWithScore(node=nodes[nodes_dict[str(pos)]], score=float(score))
+                for score, pos in zip(row_scores, row_positions)
+                if pos >= 0
+            ]
+            for row_scores, row_positions in zip(scores, positions)
+        ]
+
+
+def _file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _prepare_vectors(nodes: List[BaseNode], metric: str) -> np.ndarray:
+    """Stack node embeddings for FAISS, normalizing them in place for the cosine metric."""
+    vectors = np.asarray([node.embedding for node in nodes], dtype="float32")
+    if metric == "cosine":
+        vectors = normalize_rows(vectors)
+        for node, vector in zip(nodes, vectors):
+            node.embedding = vector.tolist()
+    return vectors
+
+
+def _delete_ref_docs(index: VectorStoreIndex, faiss_index, ref_doc_ids: List[str]):
+    """
+    Remove source documents and their vectors from a FAISS-backed index.
+
+    FaissVectorStore cannot delete, so the vectors are removed from the FAISS index
+    directly. Flat indexes compact on removal, so the surviving FAISS positions are
+    shifted down in the index struct to keep them pointing at the right nodes.
+    """
+    docstore = index.docstore
+    node_ids = set()
+    for ref_doc_id in ref_doc_ids:
+        ref_doc_info = docstore.get_ref_doc_info(ref_doc_id)
+        if ref_doc_info is not None:
+            node_ids.update(ref_doc_info.node_ids)
+
+    nodes_dict = index.index_struct.nodes_dict
+    removed = sorted(int(pos) for pos, node_id in nodes_dict.items() if node_id in node_ids)
+    if removed:
+        faiss_index.remove_ids(np.asarray(removed, dtype="int64"))
+
+    index.index_struct.nodes_dict = {
+        str(int(pos) - bisect.bisect_left(removed, int(pos))): node_id
+        for pos, node_id in nodes_dict.items()
+        if node_id not in node_ids
+    }
+    for ref_doc_id in ref_doc_ids:
+        docstore.delete_ref_doc(ref_doc_id, raise_error=False)
+    index.storage_context.index_store.add_index_struct(index.index_struct)
+
+
+# --------- Shared Retrievers ---------
+# One retriever per index location and embed model, shared by every session in the worker process.
+_retrievers: Dict[Tuple[str, str, str], Retriever] = {}
+_retrievers_lock = threading.Lock()
+
+
+def get_retriever(
+    storage_dir: str = "data/storage",
+    faiss_index_path: str = "data/faiss.index",
+    embed_model: str = "text-embedding-3-small",
+) -> Retriever:
+    """Return the process-wide retriever for this index. The index itself is loaded on first query."""
+    key = (
+        str(Path(storage_dir).resolve()),
+        str(Path(faiss_index_path).resolve()),
+        embed_model,
+    )
+    with _retrievers_lock:
+        retriever = _retrievers.get(key)
+        if retriever is None:
+            ttl = os.getenv("EMBEDDING_CACHE_TTL")
+            nprobe = os.getenv("FAISS_NPROBE")
+            ef_search = os.getenv("FAISS_EF_SEARCH")
+            retriever = Retriever(
+                storage_dir=storage_dir,
+                faiss_index_path=faiss_index_path,
+                embed_model=embed_model,
+                nprobe=int(nprobe) if nprobe else None,
+                ef_search=int(ef_search) if ef_search else None,
+                mmap=os.getenv("FAISS_MMAP", "1") == "1",
+                metric=os.getenv("RETRIEVER_METRIC") or None,
+                embedding_cache=EmbeddingCache(
+                    max_entries=int(os.getenv("EMBEDDING_CACHE_SIZE", "1024")),
+                    ttl=float(ttl) if ttl else None,
+                    disk_path=os.getenv("EMBEDDING_CACHE_PATH"),
+                ),
+                answer_cache=SemanticAnswerCache(
+                    max_distance=float(os.getenv("ANSWER_CACHE_MAX_DISTANCE", "0.05")),
+                    max_entries=int(os.getenv("ANSWER_CACHE_SIZE", "512")),
+                ),
+            )
+            _retrievers[key] = retriever
 
+    return retriever
 
 
 # Example usage (only runs if script is run directly)
 if __name__ == "__main__":
     retriever = Retriever()
-    retriever.build_index(pdf_dir="data/pdfs")
+    retriever.build_index(pdf_dir="data/pdfs", incremental=True)
     result= retriever.query("Can I edit my application after submitting?", top_k=2)
     print(result)
     print(type(result))
@@ -0,0 +1,139 @@
+import fcntl
+import os
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from src.utils import codec
+
+STATUS_CHANGES_LOG = "data/status_changes.jsonl"
+
+# the log is truncated once fully consumed and at least this large
+COMPACT_BYTES = 1 << 20
+
+
+class StatusChangeLog:
+    """
+    Append-only JSONL log of application status changes with a consumer cursor.
+
+    Producers (any process) append one line per change: the application_id and the
+    fields to set. The consumer reads complete lines from the byte offset stored in
+    `<log>.cursor` and advances it only after the changes are applied, so a crash
+    replays the batch instead of losing it (changes set fields, so a replay is
+    harmless). Appends are serialized with flock on the log, consumers with flock on
+    `<log>.lock`.
+    """
+
+    def __init__(self, path: str = STATUS_CHANGES_LOG):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.touch(exist_ok=True)
+        self.cursor_path = self.path.with_name(self.path.name + ".cursor")
+        self.lock_path = self.path.with_name(self.path.name + ".lock")
+
+    # --------- Producer ---------
+    def append(self, application_id: str, changes: Dict[str, str]):
+        self.append_many([(application_id, changes)])
+
+    def append_many(self, events: List[Tuple[str, Dict[str, str]]]):
+        lines = b"".join(
+            codec.dumps({"application_id": application_id, "changes": changes, "ts": time.time()}) + b"\n"
+            for application_id, changes in events
+        )
+        with self._locked(self.path, "ab") as f:
+            f.write(lines)
+
+    # --------- Consumer ---------
+    def pending(self) -> bool:
+        """Cheap check (one stat) for unread changes."""
+        try:
+            return self.path.stat().st_size > self._read_cursor()
+        except FileNotFoundError:
+            return False
+
+    @contextmanager
+    def consume(self, max_records: int = 1000) -> Iterator[Optional[List[dict]]]:
+        """
+        Yield up to `max_records` unread changes and commit the cursor if the block succeeds.
+
+        Yields None if another process is consuming right now.
+        """
+        lock = open(self.lock_path, "a")
+        try:
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                yield None
+                return
+
+            offset = self._read_cursor()
+            events, end = self._read_from(offset, max_records)
+            yield events
+
+            if end != offset:
+                self._write_cursor(end)
+                self._compact(end)
+        finally:
+            lock.close()
+
+    # --------- Internals ---------
+    def _read_from(self, offset: int, max_records: int) -> Tuple[List[dict], int]:
+        events = []
+        with open(self.path, "rb") as f:
+            if offset > os.fstat(f.fileno()).st_size:
+                offset = 0  # log was truncated behind the cursor
+            f.seek(offset)
+            while len(events) < max_records:
+                line = f.readline()
+                if not line.endswith(b"\n"):
+                    break  # nothing left, or a line still being written
+                offset += len(line)
+                try:
+                    events.append(codec.loads(line))
+                except codec.DECODE_ERRORS:
+                    print(f"⚠️ Skipping malformed status change at byte {offset - len(line)}")
+        return events, offset
+
+    def _compact(self, offset: int):
+        if offset < COMPACT_BYTES:
+            return
+        with self._locked(self.path, "r+") as f:
+            # only when no producer appended after the batch we just applied
+            if os.fstat(f.fileno()).st_size == offset:
+                # cursor first: a crash in between replays the batch rather than skipping new lines
+                self._write_cursor(0)
+                f.truncate(0)
+
+    def _read_cursor(self) -> int:
+        try:
+            return int(self.cursor_path.read_text() or 0)
+        except (FileNotFoundError, ValueError):
+            return 0
+
+    def _write_cursor(self, offset: int):
+        tmp_path = self.cursor_path.with_name(self.cursor_path.name + ".tmp")
+        tmp_path.write_text(str(offset))
+        os.replace(tmp_path, self.cursor_path)
+
+    @staticmethod
+    @contextmanager
+    def _locked(path: Path, mode: str):
+        with open(path, mode) as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield f
+                f.flush()
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+_log: Optional[StatusChangeLog] = None
+
+
+def get_status_change_log() -> StatusChangeLog:
+    """Process-wide change log (STATUS_CHANGES_LOG, default data/status_changes.jsonl)."""
+    global _log
+    if _log is None:
+        _log = StatusChangeLog(os.getenv("STATUS_CHANGES_LOG", STATUS_CHANGES_LOG))
+    return _log
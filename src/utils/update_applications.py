@@ -1,14 +1,13 @@
-import json
 import random
-from pathlib import Path
+from typing import Dict, Tuple
 
+from src.utils.application_store import get_application_store
+from src.utils.status_changes import get_status_change_log
 
-def update_applications():
-    app_dir = Path("data/applications")
-    if not app_dir.exists():
-        print("⚠️ No applications found.")
-        return
 
+# --------- Producer ---------
+def random_status_change() -> Dict[str, str]:
+    """Fields of a random status transition, as the demo recruiter would make it."""
     status_options = [
         "Pending",
         "Under Review",
@@ -16,7 +15,6 @@ def update_applications():
         "Selected",
         "Rejected",
     ]
-    resume_reviewed_options = ["Not yet", "In Progress", "Completed"]
     timeframe_options = ["1 week", "2 weeks", "3 days", "Immediate"]
     rejection_reasons = [
         "Skills did not match requirements",
@@ -27,42 +25,76 @@ def update_applications():
 
     reapply_possible_options = ["Yes", "No"]
 
-    # turn into a list so we don't deal with generators
-    files = list(app_dir.glob("*.json"))
-
-    for file in files:
-        with open(file, "r") as f:
-            app = json.load(f)
-
-        new_status = random.choice(status_options)
-        app["application_status"] = new_status
-
-        if new_status == "Pending":
-            app["resume_reviewed"] = "Not yet"
-            app["response_timeframe"] = "2 weeks"
-            app["rejection_reason"] = ""
-            app["reapply_possible"] = ""
-        elif new_status == "Under Review":
-            app["resume_reviewed"] = random.choice(["In Progress", "Completed"])
-            app["response_timeframe"] = random.choice(timeframe_options)
-            app["rejection_reason"] = ""
-            app["reapply_possible"] = ""
-        elif new_status == "Interview Scheduled":
-            app["resume_reviewed"] = "Completed"
-            app["response_timeframe"] = "1 week"
-            app["rejection_reason"] = ""
-            app["reapply_possible"] = ""
-        elif new_status == "Selected":
-            app["resume_reviewed"] = "Completed"
-            app["response_timeframe"] = "Immediate"
-            app["rejection_reason"] = ""
-            app["reapply_possible"] = ""
-        elif new_status == "Rejected":
-            app["resume_reviewed"] = "Completed"
-            app["response_timeframe"] = "Closed"
-            app["rejection_reason"] = random.choice(rejection_reasons)
-            app["reapply_possible"] = random.choice(reapply_possible_options)
-
-        with open(file, "w") as f:
-            json.dump(app, f, indent=2)
+    new_status = random.choice(status_options)
+    change = {"application_status": new_status}
 
+    if new_status == "Pending":
+        change["resume_reviewed"] = "Not yet"
+        change["response_timeframe"] = "2 weeks"
+        change["rejection_reason"] = ""
+        change["reapply_possible"] = ""
+    elif new_status == "Under Review":
+        change["resume_reviewed"] = random.choice(["In Progress", "Completed"])
+        change["response_timeframe"] = random.choice(timeframe_options)
+        change["rejection_reason"] = ""
+        change["reapply_possible"] = ""
+    elif new_status == "Interview Scheduled":
+        change["resume_reviewed"] = "Completed"
+        change["response_timeframe"] = "1 week"
+        change["rejection_reason"] = ""
+        change["reapply_possible"] = ""
+    elif new_status == "Selected":
+        change["resume_reviewed"] = "Completed"
+        change["response_timeframe"] = "Immediate"
+        change["rejection_reason"] = ""
+        change["reapply_possible"] = ""
+    elif new_status == "Rejected":
+        change["resume_reviewed"] = "Completed"
+        change["response_timeframe"] = "Closed"
+        change["rejection_reason"] = random.choice(rejection_reasons)
+        change["reapply_possible"] = random.choice(reapply_possible_options)
+
+    return change
+
+
+def simulate_status_changes(count: int = 5) -> int:
+    """Publish random status changes for up to `count` random applications. Returns how many were published."""
+    application_ids = get_application_store().application_ids()
+    if not application_ids:
+        return 0
+    sample = random.sample(application_ids, min(count, len(application_ids)))
+    get_status_change_log().append_many([(application_id, random_status_change()) for application_id in sample])
+    return len(sample)
+
+
+# --------- Consumer ---------
+def apply_status_changes(max_records: int = 1000) -> Tuple[int, int]:
+    """
+    Apply the next batch of changes from the change log to the affected applications only.
+
+    Changes to the same application within the batch are merged in order, so each
+    application is read and written once. Returns (change records processed,
+    applications updated); (0, 0) when there was nothing to do or another process
+    holds the log.
+    """
+    store = get_application_store()
+
+    with get_status_change_log().consume(max_records) as events:
+        if not events:
+            return 0, 0
+
+        merged: Dict[str, Dict[str, str]] = {}
+        for event in events:
+            merged.setdefault(event["application_id"], {}).update(event["changes"])
+
+        applications = []
+        for application_id, changes in merged.items():
+            app = store.get(application_id)
+            if app is None:
+                print(f"⚠️ Status change for unknown application {application_id}, skipping.")
+                continue
+            app.update(changes)
+            applications.append(app)
+
+        store.save_many(applications)
+        return len(events), len(applications)
@@ -0,0 +1,148 @@
+import asyncio
+import fcntl
+import logging
+import os
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import IO, Optional
+
+from src.utils.status_changes import get_status_change_log
+from src.utils.update_applications import apply_status_changes, simulate_status_changes
+
+logger = logging.getLogger("murf-voice-agent")
+
+UPDATER_LOCK = "data/application_updater.lock"
+
+BATCH_WINDOW = float(os.getenv("APPLICATION_UPDATER_BATCH_WINDOW", "2"))
+SIMULATE_INTERVAL = float(os.getenv("APPLICATION_SIMULATE_INTERVAL", "30"))  # 0 disables the demo producer
+SIMULATED_CHANGES = int(os.getenv("APPLICATION_SIMULATED_CHANGES", "5"))
+# how often a follower checks whether the leader went away
+LEADER_RETRY = float(os.getenv("APPLICATION_UPDATER_LEADER_RETRY", "5"))
+
+
+class UpdaterService:
+    """
+    The application status updater, run once per host however many sessions are live.
+
+    Sessions `acquire` the service and `release` it when they end: the first acquire
+    starts the background task, the last release stops it. Across worker processes,
+    only the holder of an exclusive flock on `lock_path` runs update cycles; the
+    others retry every `leader_retry` seconds and take over when the leader exits
+    (the kernel drops its lock even if it crashes). All file I/O runs on a dedicated
+    thread, never on the event loop.
+
+    The task and its event belong to the loop that first acquired the service, so use
+    get_updater_service() for one per loop: with the thread job executor every job runs
+    its own loop, and the flock keeps a single leader among them too.
+    """
+
+    def __init__(
+        self,
+        lock_path: str = UPDATER_LOCK,
+        batch_window: float = BATCH_WINDOW,
+        simulate_interval: float = SIMULATE_INTERVAL,
+        leader_retry: float = LEADER_RETRY,
+    ):
+        self.lock_path = Path(lock_path)
+        self.batch_window = batch_window
+        self.simulate_interval = simulate_interval
+        self.leader_retry = leader_retry
+
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="application-updater")
+        self._refs = 0
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = asyncio.Event()
+        self._lock_file: Optional[IO] = None
+
+    @property
+    def is_leader(self) -> bool:
+        return self._lock_file is not None
+
+    async def acquire(self):
+        self._refs += 1
+        if self._task is None:
+            self._stopping = asyncio.Event()
+            self._task = asyncio.create_task(self._run(self._stopping), name="application-updater")
+
+    async def release(self, *_):
+        """Drop one reference; the last one stops the service after its current cycle. Usable as a shutdown callback."""
+        self._refs = max(0, self._refs - 1)
+        if self._refs or self._task is None:
+            return
+
+        task, self._task = self._task, None
+        self._stopping.set()
+        await task
+
+    # --------- Internals ---------
+    async def _run(self, stopping: asyncio.Event):
+        changes = get_status_change_log()
+        next_simulation = time.monotonic() + self.simulate_interval
+
+        try:
+            while not stopping.is_set():
+                if not self.is_leader and not await self._io(self._try_lead):
+                    await self._sleep(stopping, self.leader_retry)
+                    continue
+
+                if await self._sleep(stopping, self.batch_window):
+                    break
+                try:
+                    if self.simulate_interval and time.monotonic() >= next_simulation:
+                        next_simulation = time.monotonic() + self.simulate_interval
+                        await self._io(simulate_status_changes, SIMULATED_CHANGES)
+
+                    if await self._io(changes.pending):
+                        records, updated = await self._io(apply_status_changes)
+                        if records:
+                            logger.info(f"🔄 Applied {records} status changes to {updated} applications")
+                except Exception as e:
+                    logger.error(f"Updater failed: {e}")
+        finally:
+            await self._io(self._resign)
+
+    @staticmethod
+    async def _sleep(stopping: asyncio.Event, seconds: float) -> bool:
+        """Wait `seconds` or until stopped; True if stopping."""
+        try:
+            await asyncio.wait_for(stopping.wait(), seconds)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    async def _io(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    def _try_lead(self) -> bool:
+        self.lock_path.parent.mkdir(parents=True, exist_ok=True)
+        lock_file = open(self.lock_path, "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock_file.close()
+            return False
+
+        self._lock_file = lock_file
+        logger.info(f"🔄 Application updater is running in this process (pid {os.getpid()})")
+        return True
+
+    def _resign(self):
+        if self._lock_file is not None:
+            # closing the file releases the flock for the next leader
+            self._lock_file.close()
+            self._lock_file = None
+
+
+# one service per event loop, dropped with its loop
+_services: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, UpdaterService] = weakref.WeakKeyDictionary()
+
+
+def get_updater_service() -> UpdaterService:
+    """The updater service of the running event loop; call it from a coroutine."""
+    loop = asyncio.get_running_loop()
+    service = _services.get(loop)
+    if service is None:
+        service = _services[loop] = UpdaterService()
+    return service
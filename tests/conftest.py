@@ -0,0 +1,18 @@
+import aiohttp
+import pytest_asyncio
+
+from fake_murf_server import FakeMurfServer
+
+
+@pytest_asyncio.fixture
+async def murf_server(aiohttp_server):
+    server = FakeMurfServer()
+    test_server = await aiohttp_server(server.app)
+    server.base_url = str(test_server.make_url("")).rstrip("/")
+    return server
+
+
+@pytest_asyncio.fixture
+async def http_session():
+    async with aiohttp.ClientSession() as session:
+        yield session
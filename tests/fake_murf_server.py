@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import asyncio
+import base64
+import hashlib
+import json
+
+from aiohttp import web
+
+
+def fake_audio(context_id: str, nbytes: int) -> bytes:
+    """The audio the fake server sends for `context_id`: a pattern only that context produces."""
+    pattern = hashlib.sha256(context_id.encode()).digest()
+    return (pattern * (nbytes // len(pattern) + 1))[:nbytes]
+
+
+class FakeMurfServer:
+    """
+    Local stand-in for the Murf stream-input websocket, for exercising the plugin offline.
+
+    Every text packet is answered with `chunks_per_text` audio messages of `chunk_bytes`
+    each, `delay` seconds apart, and `end` with a `final` message; `clear` stops a context
+    at once. Contexts on one socket are served concurrently, like Murf does, and the
+    audio is `fake_audio(context_id)` so a client can check that it got its own
+    context's audio back. Serve `app` with aiohttp's test server and set `base_url`.
+    """
+
+    def __init__(self, *, chunk_bytes: int = 8820, chunks_per_text: int = 2, delay: float = 0.05) -> None:
+        self.chunk_bytes = chunk_bytes
+        self.chunks_per_text = chunks_per_text
+        self.delay = delay
+        self.base_url = ""
+        self.connections = 0
+        self.contexts = 0
+        self.max_open_connections = 0
+        self.cleared: list[str] = []
+        self.audio_sent: dict[str, int] = {}  # context_id -> audio messages
+        self._open_connections = 0
+
+        self.app = web.Application()
+        self.app.router.add_get("/v1/speech/stream-input", self._handle_ws)
+
+    @property
+    def open_connections(self) -> int:
+        return self._open_connections
+
+    @property
+    def ws_url(self) -> str:
+        return f"{self.base_url}/v1/speech/stream-input"
+
+    async def _handle_ws(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self.connections += 1
+        self._open_connections += 1
+        self.max_open_connections = max(self.max_open_connections, self._open_connections)
+
+        queues: dict[str, asyncio.Queue] = {}
+        workers: dict[str, asyncio.Task] = {}
+        try:
+            async for msg in ws:
+                pkt = json.loads(msg.data)
+                context_id = pkt["context_id"]
+                if pkt.get("clear"):
+                    self.cleared.append(context_id)
+                    if context_id in workers:
+                        workers[context_id].cancel()
+                    continue
+                if context_id not in queues:
+                    self.contexts += 1
+                    queues[context_id] = asyncio.Queue()
+                    workers[context_id] = asyncio.create_task(
+                        self._serve_context(ws, context_id, queues[context_id])
+                    )
+                queues[context_id].put_nowait(pkt)
+        finally:
+            for task in workers.values():
+                task.cancel()
+            self._open_connections -= 1
+        return ws
+
+    async def _serve_context(self, ws: web.WebSocketResponse, context_id: str, queue: asyncio.Queue) -> None:
+        while True:
+            pkt = await queue.get()
+            if pkt.get("text"):
+                for _ in range(self.chunks_per_text):
+                    await asyncio.sleep(self.delay)
+                    audio = base64.b64encode(fake_audio(context_id, self.chunk_bytes)).decode()
+                    await ws.send_str(json.dumps({"audio": audio, "context_id": context_id}))
+                    self.audio_sent[context_id] = self.audio_sent.get(context_id, 0) + 1
+            if pkt.get("end"):
+                await ws.send_str(json.dumps({"final": True, "context_id": context_id}))
+                return
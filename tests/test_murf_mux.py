@@ -0,0 +1,210 @@
+import asyncio
+import gc
+
+import pytest
+from livekit.agents import APIStatusError
+
+from custom.livekit.plugins.murfai.metrics import POOL_CONNECTS, REQUEST_LATENCY, TIME_TO_FIRST_AUDIO
+from custom.livekit.plugins.murfai.mux import ContextMultiplexer
+from custom.livekit.plugins.murfai.tts import TTS
+from fake_murf_server import fake_audio
+
+pytestmark = pytest.mark.asyncio
+
+
+def make_mux(murf_server, http_session, **kwargs) -> ContextMultiplexer:
+    async def connect(owner, timeout):
+        return await http_session.ws_connect(murf_server.ws_url)
+
+    kwargs.setdefault("max_contexts_per_connection", 4)
+    kwargs.setdefault("max_queued_messages", 2)
+    return ContextMultiplexer(connect_cb=connect, **kwargs)
+
+
+async def speak(mux: ContextMultiplexer, i: int) -> tuple[str, list[bytes]]:
+    async with mux.context(timeout=5) as ctx:
+        for sentence in ("Hello there. ", f"This is stream {i}. "):
+            await ctx.send_text({}, sentence)
+        await ctx.end({})
+        return ctx.context_id, [msg.audio async for msg in ctx if msg.audio]
+
+
+def tts_for(murf_server, http_session) -> TTS:
+    return TTS(api_key="fake", base_url=murf_server.base_url, http_session=http_session, audio_cache=None)
+
+
+async def synthesize(tts: TTS, text: str) -> int:
+    stream = tts.stream()
+    stream.push_text(text)
+    stream.end_input()
+    return sum([len(ev.frame.data) * 2 async for ev in stream])
+
+
+# --------- Multiplexer ---------
+async def test_contexts_get_only_their_own_audio(murf_server, http_session):
+    mux = make_mux(murf_server, http_session)
+    results = await asyncio.gather(*(speak(mux, i) for i in range(10)))
+    await mux.aclose()
+
+    expected_chunks = 2 * murf_server.chunks_per_text
+    for context_id, chunks in results:
+        assert chunks == [fake_audio(context_id, murf_server.chunk_bytes)] * expected_chunks
+    # 10 contexts at 4 per socket
+    assert murf_server.connections == 3
+
+
+async def test_cancel_clears_context_and_keeps_socket(murf_server, http_session):
+    mux = make_mux(murf_server, http_session)
+    async with mux.context(timeout=5) as ctx:
+        for _ in range(5):
+            await ctx.send_text({}, "A long answer nobody will hear. ")
+        await ctx.recv()
+        cancelled = ctx.context_id
+    await asyncio.sleep(murf_server.delay * 3)
+
+    assert murf_server.cleared == [cancelled]
+    assert murf_server.audio_sent[cancelled] < 5 * murf_server.chunks_per_text
+
+    context_id, chunks = await speak(mux, 0)
+    assert chunks and all(chunk == fake_audio(context_id, murf_server.chunk_bytes) for chunk in chunks)
+    assert murf_server.connections == 1
+    await mux.aclose()
+
+
+async def test_stuck_context_is_dropped_without_stalling_the_socket(murf_server, http_session):
+    mux = make_mux(murf_server, http_session, max_queued_messages=2)
+    stuck = await mux.open_context(timeout=5)
+    for _ in range(3):
+        await stuck.send_text({}, "Nobody reads this. ")
+
+    # 6 chunks arrive for a context that never reads; the other context on the socket still finishes
+    context_id, chunks = await asyncio.wait_for(speak(mux, 0), 5)
+    assert chunks == [fake_audio(context_id, murf_server.chunk_bytes)] * 2 * murf_server.chunks_per_text
+    assert murf_server.connections == 1
+
+    await asyncio.sleep(murf_server.delay)
+    assert stuck.context_id in murf_server.cleared
+    with pytest.raises(APIStatusError):
+        while True:
+            await stuck.recv()
+    stuck.cancel()
+    assert murf_server.cleared.count(stuck.context_id) == 1
+    await mux.aclose()
+
+
+# --------- TTS streams ---------
+async def test_concurrent_streams_share_websockets(murf_server, http_session):
+    tts = tts_for(murf_server, http_session)
+    text = "Hello caller, thanks for checking in. Your application is in review."
+    sizes = await asyncio.gather(*(synthesize(tts, text) for _ in range(20)))
+    await tts.aclose()
+
+    assert len(set(sizes)) == 1 and sizes[0] > 0
+    # 20 streams at 8 contexts per socket, not one socket each
+    assert murf_server.max_open_connections <= 4
+
+
+async def test_barge_in_clears_context_and_reuses_socket(murf_server, http_session):
+    tts = tts_for(murf_server, http_session)
+    await synthesize(tts, "Thanks for calling.")
+    connections = murf_server.connections
+
+    stream = tts.stream()
+    stream.push_text("This is a long answer that the caller is going to interrupt. " * 5)
+    stream.end_input()
+    await stream.__anext__()
+    await stream.aclose()
+    await asyncio.sleep(murf_server.delay)
+
+    assert len(murf_server.cleared) == 1
+    assert await synthesize(tts, "How can I help?") > 0
+    assert murf_server.connections == connections
+    await tts.aclose()
+
+
+async def test_prewarm_connects_before_the_first_request(murf_server, http_session):
+    def connects(trigger: str) -> float:
+        return POOL_CONNECTS.labels(trigger=trigger)._value.get()
+
+    instances = [tts_for(murf_server, http_session) for _ in range(12)]
+    for tts in instances:
+        tts.prewarm()
+    await asyncio.sleep(0.2)
+    mux = instances[0]._mux
+    warmed = len(mux.connections)
+    on_request = connects("request")
+
+    await asyncio.gather(*(synthesize(tts, "Thanks for calling, how can I help?") for tts in instances))
+
+    assert warmed == mux.target_connections() > 0
+    assert connects("request") == on_request
+    for tts in instances:
+        await tts.aclose()
+    assert mux.closed
+
+
+async def test_maintainer_stops_when_the_last_session_is_gone(murf_server, http_session):
+    mux = make_mux(murf_server, http_session, maintain_interval=0.05)
+    owners = []
+
+    async def connect(owner, timeout):
+        owners.append(owner is not None)
+        return await http_session.ws_connect(murf_server.ws_url)
+
+    mux._connect_cb = connect
+
+    class Session:
+        pass
+
+    session = Session()
+    mux.prewarm(owner=session)
+    await asyncio.sleep(0.2)
+    assert len(mux.connections) == 1 and murf_server.open_connections == 1
+
+    # the job ended without closing its TTS: its sockets go with it
+    del session
+    gc.collect()
+    await asyncio.sleep(0.2)
+    assert mux.closed
+    assert mux._maintain_task is None
+    assert murf_server.open_connections == 0
+    assert owners and all(owners)
+
+
+async def test_ownerless_contexts_never_connect_in_the_background(murf_server, http_session):
+    mux = make_mux(murf_server, http_session, maintain_interval=0.05)
+    await speak(mux, 0)
+    mux.prewarm()
+    await asyncio.sleep(0.2)
+
+    assert mux._maintain_task is None
+    assert murf_server.connections == 1
+    await mux.aclose()
+
+
+# --------- Metrics ---------
+async def test_time_to_first_audio_includes_the_tokenizer_wait(murf_server, http_session):
+    def observed(histogram) -> tuple[float, float]:
+        child = histogram.labels(streamed="true")
+        return child._sum.get(), sum(bucket.get() for bucket in child._buckets)
+
+    tts = tts_for(murf_server, http_session)
+    collected = []
+    tts.on("metrics_collected", collected.append)
+    ttfa_before, requests_before = observed(TIME_TO_FIRST_AUDIO)[0], observed(REQUEST_LATENCY)[1]
+
+    stream = tts.stream()
+    stream.push_text("Thanks for calling how can I help")
+    # no clause break yet: the tokenizer holds the text back and Murf gets nothing
+    await asyncio.sleep(0.2)
+    stream.push_text("?")
+    stream.end_input()
+    assert sum([len(ev.frame.data) async for ev in stream]) > 0
+    await asyncio.sleep(0.05)
+    await tts.aclose()
+
+    assert len(collected) == 1
+    assert collected[0].streamed and collected[0].ttfb > 0 and collected[0].audio_duration > 0
+    ttfa = observed(TIME_TO_FIRST_AUDIO)[0] - ttfa_before
+    assert 0.2 <= ttfa < 0.2 + collected[0].ttfb
+    assert observed(REQUEST_LATENCY)[1] - requests_before == 1